@@ -0,0 +1,220 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional, Sequence, Type
+import asyncio
+import logging
+
+import httpx
+import orjson
+from pydantic import BaseModel
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+from config import settings
+from agents.batcher import PromptPacker
+from agents.exact_cache import _EXACT
+from utils.truncate import truncate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Appended to an agent's SYSTEM prompt for packed requests; still a constant,
+# so packed requests share their own cached prefix
+# Added to the fallback result when a call fails, holding the error, so
+# callers can tell a fallback from a real answer
+ERROR_KEY = "_error"
+
+PACKED_INSTRUCTIONS = """
+
+You may receive several independent requests, each wrapped in <request id="N"> tags.
+Answer each request on its own and return VALID JSON of this form:
+{"results": [{"id": N, ...the JSON object for that request...}]}"""
+
+
+def _transient(e: BaseException) -> bool:
+    # Connection problems and server errors; a 4xx won't go away on retry, and
+    # a read timeout means the generation already ran for processing_timeout
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code >= 500
+    return isinstance(e, httpx.TransportError) and not isinstance(e, httpx.ReadTimeout)
+
+
+class LLMJsonAgent(ABC):
+    """Shared plumbing for agents that ask Ollama for a single JSON object.
+
+    Subclasses supply the prompts (``SYSTEM`` and ``_prompt``), a ``_fallback``
+    result, and which model and output budget to use; ``run`` handles the
+    exact and semantic caches, the Ollama call and JSON parsing.
+    """
+    ROLE = ""
+    GOAL = ""
+    BACKSTORY = ""
+    # Invariant prefix of every request - never interpolated, so Ollama can
+    # reuse its KV cache across documents. Per-document data goes last.
+    SYSTEM = ""
+    # Document preview budget, in model tokens
+    MAX_TOKENS = 800
+    # Names of the settings holding this agent's model and num_predict
+    MODEL_SETTING = "ollama_model_fast"
+    NUM_PREDICT_SETTING = "classify_num_predict"
+    # Used in error messages, e.g. "Classification error: ..."
+    LABEL = "Agent"
+    # Whether concurrent documents may be packed into one request
+    PACKABLE = False
+    # Whether near-duplicate prompts may share answers through the semantic cache
+    SEMANTIC_CACHEABLE = True
+    # Model the agent's answers are built into. LLM answers are validated
+    # against it once, before caching, so callers can model_construct them
+    RESULT_MODEL: Optional[Type[BaseModel]] = None
+    
+    def __init__(self, semantic_cache=None, tokenizer=None, client=None):
+        self.semantic_cache = semantic_cache
+        self.tokenizer = tokenizer
+        self.model_name = getattr(settings, self.MODEL_SETTING)
+        self.num_predict = getattr(settings, self.NUM_PREDICT_SETTING)
+        # Shared client from the app; only close it here if this agent made it
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            base_url=settings.ollama_base_url,
+            timeout=settings.processing_timeout
+        )
+        # Caps in-flight Ollama requests from this agent across all documents
+        self._slots = asyncio.Semaphore(settings.max_concurrent_requests)
+        self.packed_system = self.SYSTEM + PACKED_INSTRUCTIONS
+        self.packer = None
+        if self.PACKABLE and settings.packed_batching_enabled:
+            self.packer = PromptPacker(
+                self._chat_packed,
+                batch_size=settings.packed_batch_size,
+                max_wait_ms=settings.packed_max_wait_ms
+            )
+    
+    async def run(self, namespace: str, key_parts: Sequence[str], prompt: str, emb=None) -> Dict[str, Any]:
+        """Answer ``prompt`` from the caches if possible, otherwise from Ollama.
+
+        ``key_parts`` identify the request exactly; joined by newlines they are
+        also the text embedded for the semantic cache, unless ``emb`` is given.
+        """
+        key = _EXACT.key(namespace, *key_parts)
+        cached = _EXACT.get(key)
+        if cached is not None:
+            return cached
+        
+        if self.semantic_cache is not None and self.SEMANTIC_CACHEABLE:
+            if emb is None:
+                emb, cached = await asyncio.to_thread(
+                    self.semantic_cache.search, "\n".join(key_parts), namespace
+                )
+            else:
+                cached = await asyncio.to_thread(self.semantic_cache.lookup, emb, namespace)
+            if cached is not None:
+                try:
+                    # Entries persisted by older versions may predate validation
+                    cached = self._validate(cached)
+                except Exception:
+                    cached = None
+            if cached is not None:
+                _EXACT.put(key, cached)
+                return cached
+        
+        try:
+            if self.packer is not None:
+                parsed = await self.packer.submit(prompt)
+            else:
+                parsed = await self._chat_json(prompt)
+            parsed = self._validate(parsed)
+            _EXACT.put(key, parsed)
+            if emb is not None:
+                await asyncio.to_thread(self.semantic_cache.put, emb, parsed, namespace)
+            return parsed
+        
+        except Exception as e:
+            logger.error(f"{self.LABEL} error: {e}")
+            return {**self._fallback(e), ERROR_KEY: str(e)}
+    
+    def _validate(self, parsed: Any) -> Dict[str, Any]:
+        """Check an LLM answer against RESULT_MODEL and return it as plain JSON
+        values; raises if it doesn't fit"""
+        if self.RESULT_MODEL is not None:
+            return self.RESULT_MODEL.model_validate(parsed).model_dump(mode="json")
+        if not isinstance(parsed, dict):
+            raise ValueError(f"expected a JSON object, got {type(parsed).__name__}")
+        return parsed
+    
+    async def aclose(self):
+        if self.packer is not None:
+            await self.packer.aclose()
+        if self._owns_client:
+            await self.client.aclose()
+    
+    def _preview(self, document_content: str) -> str:
+        return truncate_tokens(document_content, self.tokenizer, self.MAX_TOKENS)
+    
+    @retry(
+        retry=retry_if_exception(_transient),
+        stop=stop_after_attempt(settings.llm_retry_attempts),
+        wait=wait_exponential(multiplier=0.5, max=4),
+        reraise=True
+    )
+    async def _chat(self, prompt: str, system: Optional[str] = None,
+                    num_predict: Optional[int] = None) -> str:
+        payload = {
+            "model": self.model_name,
+            "messages": [
+                {"role": "system", "content": system or self.SYSTEM},
+                {"role": "user", "content": prompt}
+            ],
+            "format": "json",
+            "stream": False,
+            "keep_alive": settings.ollama_keep_alive,
+            "options": {
+                "temperature": settings.llm_temperature,
+                "top_p": settings.llm_top_p,
+                "num_predict": num_predict or self.num_predict,
+                "num_ctx": settings.agent_num_ctx,
+                "stop": settings.llm_stop
+            }
+        }
+        async with self._slots:
+            resp = await self.client.post("/api/chat", json=payload)
+            resp.raise_for_status()
+            data = resp.json()
+        return data["message"]["content"]
+    
+    async def _chat_json(self, prompt: str) -> Dict[str, Any]:
+        return orjson.loads(await self._chat(prompt))
+    
+    async def _chat_packed(self, prompts: List[str]) -> List[Any]:
+        """Answer several prompts with one request; used as the packer's run_batch"""
+        if len(prompts) == 1:
+            return [await self._chat_json(prompts[0])]
+        
+        body = "\n\n".join(f'<request id="{i}">\n{p}\n</request>' for i, p in enumerate(prompts))
+        results: List[Any] = [None] * len(prompts)
+        try:
+            content = await self._chat(
+                body,
+                system=self.packed_system,
+                num_predict=self.num_predict * len(prompts)
+            )
+            for item in orjson.loads(content).get("results", []):
+                i = item.pop("id", None) if isinstance(item, dict) else None
+                if isinstance(i, int) and 0 <= i < len(results):
+                    try:
+                        results[i] = self._validate(item)
+                    except Exception as e:
+                        logger.warning(f"{self.LABEL} packed answer {i} is invalid, retrying it alone: {e}")
+        except Exception as e:
+            logger.warning(f"{self.LABEL} packed request failed, answering individually: {e}")
+        
+        # Answer anything the packed response dropped or got wrong one by one
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            retried = await asyncio.gather(
+                *(self._chat_json(prompts[i]) for i in missing), return_exceptions=True
+            )
+            for i, result in zip(missing, retried):
+                results[i] = result
+        return results
+    
+    @staticmethod
+    @abstractmethod
+    def _fallback(e: Exception) -> Dict[str, Any]:
+        """Result to return when the LLM call fails"""
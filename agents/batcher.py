@@ -0,0 +1,90 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Set, Tuple
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _MicroBatcher(ABC):
+    """Collects items submitted within ``max_wait_ms`` of each other (up to
+    ``batch_size``) and hands each window to ``_dispatch`` as one batch."""
+    
+    def __init__(self, batch_size: int, max_wait_ms: int):
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "asyncio.Queue[Tuple[asyncio.Future, Any]]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+    
+    async def submit(self, item: Any) -> Any:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((fut, item))
+        return await fut
+    
+    async def aclose(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Dispatch without waiting so the next window starts collecting now
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+    
+    @abstractmethod
+    async def _dispatch(self, batch: List[Tuple[asyncio.Future, Any]]):
+        """Resolve every future in ``batch``"""
+    
+    @staticmethod
+    def _resolve(fut: asyncio.Future, result: Any):
+        if fut.done():
+            return
+        if isinstance(result, BaseException):
+            fut.set_exception(result)
+        else:
+            fut.set_result(result)
+
+
+class PromptPacker(_MicroBatcher):
+    """Packs prompts from concurrent documents into a single LLM request.
+
+    Prompts submitted within ``max_wait_ms`` of each other (up to
+    ``batch_size``) are passed together to ``run_batch``, which answers all of
+    them in one call and returns one parsed result per prompt, in order. This
+    shares one prefill and one round-trip across the whole window.
+    """
+    
+    def __init__(self, run_batch: Callable[[List[str]], Awaitable[List[Dict[str, Any]]]],
+                 batch_size: int = 8, max_wait_ms: int = 20):
+        super().__init__(batch_size, max_wait_ms)
+        self.run_batch = run_batch
+    
+    async def submit(self, prompt: str) -> Dict[str, Any]:
+        """Queue a user prompt and wait for its parsed JSON answer"""
+        return await super().submit(prompt)
+    
+    async def _dispatch(self, batch: List[Tuple[asyncio.Future, str]]):
+        logger.debug(f"Packing {len(batch)} prompts into one request")
+        try:
+            results = await self.run_batch([prompt for _, prompt in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (fut, _), result in zip(batch, results):
+            self._resolve(fut, result)
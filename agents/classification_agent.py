@@ -1,34 +1,16 @@
-from crewai import Agent, Task, Crew
 from typing import Dict, Any
-import json
-import re
 
-class ClassificationAgent:
-    def __init__(self, llm):
-        self.llm = llm
-        # Pass llm explicitly and set allow_delegation=False
-        self.agent = Agent(
-            role="Document Classification Specialist",
-            goal="Accurately identify document types with high confidence",
-            backstory="""You are an expert document analyst who can identify 
-            invoices, contracts, purchase orders, and technical specifications. 
-            You analyze structure, terminology, and content to classify documents.""",
-            verbose=False,
-            allow_delegation=False,
-            llm=llm  # Pass the LLM explicitly
-        )
-    
-    def classify(self, document_content: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
-        # Truncate content for efficiency
-        content_preview = document_content[:2000]
-        
-        task = Task(
-            description=f"""Analyze this document and classify it.
+from agents.base import LLMJsonAgent
+from agents.fast_classifier import fast_classify
+from models import ClassificationResult
 
-Document Content:
-{content_preview}
-
-File Info: {metadata.get('file_size', 'unknown')} bytes
+class ClassificationAgent(LLMJsonAgent):
+    ROLE = "Document Classification Specialist"
+    GOAL = "Accurately identify document types with high confidence"
+    BACKSTORY = """You are an expert document analyst who can identify invoices, contracts,
+purchase orders, and technical specifications. You analyze structure, terminology,
+and content to classify documents."""
+    SYSTEM = BACKSTORY + """
 
 Identify the document type from these options:
 - invoice: Has invoice number, items, prices, totals
@@ -39,42 +21,48 @@ Identify the document type from these options:
 - unknown: Cannot determine type
 
 Provide your analysis as VALID JSON with this exact structure:
-{{
+{
     "document_type": "one of the types above",
     "confidence": 0.0 to 1.0,
     "reasoning": "explain your classification",
     "alternative_types": []
-}}
+}
 
-IMPORTANT: Return ONLY the JSON object, no other text.""",
-            agent=self.agent,
-            expected_output="JSON classification result"
-        )
+IMPORTANT: Return ONLY the JSON object, no other text."""
+    MAX_TOKENS = 800
+    MODEL_SETTING = "ollama_model_fast"
+    NUM_PREDICT_SETTING = "classify_num_predict"
+    LABEL = "Classification"
+    PACKABLE = True
+    RESULT_MODEL = ClassificationResult
+    
+    async def classify(self, document_content: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        content_preview = self._preview(document_content)
         
-        # Create crew with single agent and task
-        crew = Crew(
-            agents=[self.agent],
-            tasks=[task],
-            verbose=False
-        )
+        # Unambiguous keyword matches never reach the LLM
+        quick = fast_classify(content_preview)
+        if quick is not None:
+            return quick
         
-        try:
-            result = crew.kickoff()
-            result_str = str(result)
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', result_str, re.DOTALL)
-            if json_match:
-                parsed = json.loads(json_match.group())
-                return parsed
-            else:
-                raise ValueError("No JSON found in response")
-                
-        except Exception as e:
-            print(f"Classification error: {e}")
-            return {
-                "document_type": "unknown",
-                "confidence": 0.0,
-                "reasoning": f"Error: {str(e)}",
-                "alternative_types": []
-            }
\ No newline at end of file
+        return await self.run("classify", (content_preview,), self._prompt(content_preview, metadata))
+    
+    async def warmup(self):
+        """Send one tiny request so Ollama has the system prompt's KV cache ready"""
+        await self._chat(self._prompt("warmup", {"file_size": 6}))
+    
+    def _prompt(self, content_preview: str, metadata: Dict[str, Any]) -> str:
+        return f"""Analyze this document and classify it.
+
+File Info: {metadata.get('file_size', 'unknown')} bytes
+
+Document Content:
+{content_preview}"""
+
+    @staticmethod
+    def _fallback(e: Exception) -> Dict[str, Any]:
+        return {
+            "document_type": "unknown",
+            "confidence": 0.0,
+            "reasoning": f"Error: {str(e)}",
+            "alternative_types": []
+        }
@@ -0,0 +1,43 @@
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Dict, Any, Optional
+import threading
+
+
+class ExactCache:
+    """Bounded LRU of agent results keyed by a digest of the exact prompt inputs.
+
+    Keys are 16-byte blake2b digests, so cached entries never hold on to the
+    document text itself.
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(namespace: str, *parts: str) -> str:
+        h = blake2b(namespace.encode(), digest_size=16)
+        for part in parts:
+            h.update(b"\x00")
+            h.update(part.encode("utf-8", "ignore"))
+        return h.hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+    
+    def put(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+# Shared by all agents; keys are namespaced per agent
+_EXACT = ExactCache(maxsize=1024)
@@ -1,79 +1,93 @@
-from crewai import Agent, Task, Crew
-from typing import Dict, Any
-import json
-import re
+from typing import Dict, Any, Optional, Tuple
+import asyncio
 
-class ExtractionAgent:
-    def __init__(self, llm):
-        self.llm = llm
-        self.agent = Agent(
-            role="Data Extraction Specialist",
-            goal="Extract accurate data from documents",
-            backstory="""You are a data extraction expert who finds and extracts 
-            relevant fields from documents, handling various formats and structures.""",
-            verbose=False,
-            allow_delegation=False,
-            llm=llm
-        )
-    
-    def extract(self, document_content: str, document_type: str) -> Dict[str, Any]:
-        content_preview = document_content[:2500]
-        
-        field_templates = {
-            "invoice": "invoice_number, date, vendor, total_amount, items, tax",
-            "contract": "parties, effective_date, term, value, obligations",
-            "purchase_order": "po_number, date, vendor, items, total, delivery_date",
-            "technical_specification": "product_name, version, specifications",
-        }
-        
-        fields = field_templates.get(document_type, "key_information")
-        
-        task = Task(
-            description=f"""Extract data from this {document_type}:
+from agents.base import LLMJsonAgent
+from models import DocumentType, ExtractionResult
 
-Document:
-{content_preview}
+FIELD_TEMPLATES = {
+    "invoice": "invoice_number, date, vendor, total_amount, items, tax",
+    "contract": "parties, effective_date, term, value, obligations",
+    "purchase_order": "po_number, date, vendor, items, total, delivery_date",
+    "technical_specification": "product_name, version, specifications",
+}
+
+# Placeholder for the document preview in the prebuilt prompts below
+CONTENT_SENTINEL = "{{CONTENT}}"
+
+def _build_prompt(document_type: str, fields: str) -> str:
+    return f"""Extract data from this {document_type}.
 
 Extract these fields: {fields}
 
+Document:
+{CONTENT_SENTINEL}"""
+
+# Full prompt per known type, built once so each type sends an identical prefix
+PROMPT_TEMPLATES = {dt: _build_prompt(dt, fields) for dt, fields in FIELD_TEMPLATES.items()}
+
+# The document type comes from the LLM and names a cache namespace (and its
+# files), so anything outside DocumentType is treated as "unknown"
+DOCUMENT_TYPES = frozenset(t.value for t in DocumentType)
+
+class ExtractionAgent(LLMJsonAgent):
+    ROLE = "Data Extraction Specialist"
+    GOAL = "Extract accurate data from documents"
+    BACKSTORY = """You are a data extraction expert who finds and extracts relevant fields
+from documents, handling various formats and structures."""
+    SYSTEM = BACKSTORY + """
+
 Return VALID JSON with this structure:
-{{
-    "fields": {{
+{
+    "fields": {
         "field_name": "extracted_value",
         ...
-    }},
+    },
     "confidence": 0.0 to 1.0,
     "extraction_method": "ai_extraction",
     "warnings": ["list any issues"]
-}}
+}
 
-IMPORTANT: Return ONLY JSON, no other text.""",
-            agent=self.agent,
-            expected_output="JSON extraction result"
-        )
+IMPORTANT: Return ONLY JSON, no other text."""
+    MAX_TOKENS = 1000
+    MODEL_SETTING = "ollama_model_accurate"
+    NUM_PREDICT_SETTING = "extract_num_predict"
+    LABEL = "Extraction"
+    PACKABLE = True
+    RESULT_MODEL = ExtractionResult
+    
+    async def prepare(self, document_content: str) -> Tuple[str, Any]:
+        """Truncate and embed the preview; independent of the document type, so
+        it can run while classification is still waiting on the LLM"""
+        content_preview = self._preview(document_content)
+        emb = None
+        if self.semantic_cache is not None:
+            emb = await asyncio.to_thread(self.semantic_cache.encode, content_preview)
+        return content_preview, emb
+    
+    async def extract(self, document_content: str, document_type: str,
+                      prepared: Optional[Tuple[str, Any]] = None) -> Dict[str, Any]:
+        if prepared is None:
+            prepared = await self.prepare(document_content)
+        content_preview, emb = prepared
+        if document_type not in DOCUMENT_TYPES:
+            document_type = DocumentType.UNKNOWN.value
         
-        crew = Crew(
-            agents=[self.agent],
-            tasks=[task],
-            verbose=False
+        return await self.run(
+            f"extract:{document_type}", (content_preview,),
+            self._prompt(content_preview, document_type), emb
         )
-        
-        try:
-            result = crew.kickoff()
-            result_str = str(result)
-            
-            json_match = re.search(r'\{.*\}', result_str, re.DOTALL)
-            if json_match:
-                parsed = json.loads(json_match.group())
-                return parsed
-            else:
-                raise ValueError("No JSON in response")
-                
-        except Exception as e:
-            print(f"Extraction error: {e}")
-            return {
-                "fields": {},
-                "confidence": 0.0,
-                "extraction_method": "failed",
-                "warnings": [str(e)]
-            }
\ No newline at end of file
+    
+    def _prompt(self, content_preview: str, document_type: str) -> str:
+        template = PROMPT_TEMPLATES.get(document_type)
+        if template is None:
+            template = _build_prompt(document_type, "key_information")
+        return template.replace(CONTENT_SENTINEL, content_preview, 1)
+    
+    @staticmethod
+    def _fallback(e: Exception) -> Dict[str, Any]:
+        return {
+            "fields": {},
+            "confidence": 0.0,
+            "extraction_method": "failed",
+            "warnings": [str(e)]
+        }
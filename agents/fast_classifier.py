@@ -0,0 +1,114 @@
+from typing import Dict, Any, Optional, Sequence, Tuple
+import re
+
+from agents.score_kernel import KeywordScorer
+
+# Distinct keywords needed before a type is considered an unambiguous match
+MIN_HITS = 3
+# Confidence for a match with no keywords of other types; it drops towards
+# MIN_CONFIDENCE as other types' keywords make up more of the document
+MAX_CONFIDENCE = 0.9
+MIN_CONFIDENCE = 0.5
+
+# Keywords per document type, each a tuple of literal spellings. Matching is
+# case-insensitive and whole-word, with any whitespace between words. Both the
+# distinct-keyword regexes and the occurrence scorer are built from this table.
+KEYWORDS: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+    "invoice": (
+        ("invoice #", "invoice#", "invoice no", "invoice number"),
+        ("subtotal",),
+        ("tax",),
+        ("amount due",),
+        ("payment terms",),
+        ("bill to", "billed to"),
+        ("due date",),
+    ),
+    "contract": (
+        ("agreement",),
+        ("parties",),
+        ("term",),
+        ("obligation", "obligations"),
+        ("signature", "signatures"),
+        ("whereas",),
+        ("governing law",),
+        ("terminate", "termination"),
+        ("compensation",),
+    ),
+    "purchase_order": (
+        ("purchase order",),
+        ("po #", "po#", "po no", "po number"),
+        ("vendor",),
+        ("ship to", "shipping to"),
+        ("delivery",),
+        ("buyer",),
+        ("qty", "quantity"),
+    ),
+    "technical_specification": (
+        ("specification", "specifications"),
+        ("requirement", "requirements"),
+        ("version",),
+        ("dimension", "dimensions"),
+        ("weight",),
+        ("interface",),
+        ("power",),
+        ("compatible", "compatibility"),
+    ),
+}
+
+
+def _literal_re(literal: str) -> str:
+    # \b only where the literal starts/ends with a word character, as in "po #"
+    body = r"\s+".join(re.escape(word) for word in literal.split())
+    head = r"\b" if re.match(r"\w", literal) else ""
+    tail = r"\b" if re.search(r"\w$", literal) else ""
+    return head + body + tail
+
+
+def _compile(keywords: Sequence[Tuple[str, ...]]) -> "re.Pattern[str]":
+    # One capture group per keyword, so m.lastindex identifies which keyword hit
+    return re.compile(
+        "|".join("(" + "|".join(_literal_re(s) for s in spellings) + ")" for spellings in keywords),
+        re.IGNORECASE
+    )
+
+
+PATTERNS = {doc_type: _compile(keywords) for doc_type, keywords in KEYWORDS.items()}
+
+SCORER = KeywordScorer({
+    doc_type: [spelling for spellings in keywords for spelling in spellings]
+    for doc_type, keywords in KEYWORDS.items()
+})
+
+
+def keyword_hits(text: str) -> Dict[str, int]:
+    """Number of distinct keywords of each document type found in ``text``"""
+    return {
+        doc_type: len({m.lastindex for m in pattern.finditer(text)})
+        for doc_type, pattern in PATTERNS.items()
+    }
+
+
+def fast_classify(text: str) -> Optional[Dict[str, Any]]:
+    """Classify obvious documents by keywords; None means ask the LLM"""
+    hits = keyword_hits(text)
+    matched = [doc_type for doc_type, count in hits.items() if count >= MIN_HITS]
+    if len(matched) != 1:
+        # Nothing conclusive, or several types - possibly a mixed document
+        return None
+    
+    doc_type = matched[0]
+    # Occurrences of other types' keywords lower the confidence and are
+    # reported as alternatives, with their share of all keyword occurrences
+    scores = SCORER.score(text)
+    total = sum(scores.values()) or 1
+    share = scores[doc_type] / total
+    others = sorted(
+        (t for t, n in scores.items() if t != doc_type and n > 0),
+        key=scores.__getitem__, reverse=True
+    )
+    return {
+        "document_type": doc_type,
+        "confidence": round(MIN_CONFIDENCE + (MAX_CONFIDENCE - MIN_CONFIDENCE) * share, 2),
+        "reasoning": f"keyword-match: {hits[doc_type]} distinct {doc_type} keywords",
+        "alternative_types": [{t: round(scores[t] / total, 2)} for t in others]
+    }
@@ -0,0 +1,95 @@
+from typing import Dict, List, Sequence
+
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _is_word_byte(b: int) -> bool:
+    # Same test as regex \w for ASCII; non-ASCII bytes are treated as letters
+    return (48 <= b <= 57) or (65 <= b <= 90) or (97 <= b <= 122) or b == 95 or b >= 128
+
+
+if NUMBA_AVAILABLE:
+    _is_word_byte_jit = njit(cache=True)(_is_word_byte)
+    
+    @njit(cache=True)
+    def _score(buf, needles_flat, offsets, needle_types, n_types):
+        """Count whole-word occurrences of every needle in buf, summed per type"""
+        counts = np.zeros(n_types, dtype=np.int64)
+        n = buf.shape[0]
+        for j in range(offsets.shape[0] - 1):
+            start, end = offsets[j], offsets[j + 1]
+            width = end - start
+            first = needles_flat[start]
+            # Like \b, boundaries only apply at needle ends that are word characters
+            check_head = _is_word_byte_jit(first)
+            check_tail = _is_word_byte_jit(needles_flat[end - 1])
+            for i in range(n - width + 1):
+                if buf[i] != first:
+                    continue
+                k = 1
+                while k < width and buf[i + k] == needles_flat[start + k]:
+                    k += 1
+                if k < width:
+                    continue
+                if check_head and i > 0 and _is_word_byte_jit(buf[i - 1]):
+                    continue
+                if check_tail and i + width < n and _is_word_byte_jit(buf[i + width]):
+                    continue
+                counts[needle_types[j]] += 1
+        return counts
+
+
+def _count_words(buf: bytes, needle: bytes) -> int:
+    """Pure-Python equivalent of the kernel for a single needle"""
+    check_head = _is_word_byte(needle[0])
+    check_tail = _is_word_byte(needle[-1])
+    count = 0
+    i = buf.find(needle)
+    while i != -1:
+        end = i + len(needle)
+        if not ((check_head and i > 0 and _is_word_byte(buf[i - 1]))
+                or (check_tail and end < len(buf) and _is_word_byte(buf[end]))):
+            count += 1
+        i = buf.find(needle, i + 1)
+    return count
+
+
+class KeywordScorer:
+    """Total keyword occurrences per document type.
+
+    Keywords are literal phrases matched as whole words, case-insensitively
+    and with any run of whitespace between words, so they count the same
+    text as the fast classifier's regexes. Uses a Numba kernel when numba is
+    installed and a ``bytes.find`` loop otherwise.
+    """
+    
+    def __init__(self, keywords: Dict[str, Sequence[str]]):
+        self.types: List[str] = list(keywords)
+        self._needles = [
+            (t, " ".join(kw.lower().split()).encode("utf-8"))
+            for t, kws in enumerate(keywords.values())
+            for kw in kws
+        ]
+        if NUMBA_AVAILABLE:
+            self._flat = np.frombuffer(b"".join(kw for _, kw in self._needles), dtype=np.uint8)
+            self._offsets = np.cumsum([0] + [len(kw) for _, kw in self._needles]).astype(np.int64)
+            self._needle_types = np.array([t for t, _ in self._needles], dtype=np.int64)
+    
+    def score(self, text: str) -> Dict[str, int]:
+        buf = " ".join(text.lower().split()).encode("utf-8", "ignore")
+        if NUMBA_AVAILABLE:
+            counts = _score(
+                np.frombuffer(buf, dtype=np.uint8), self._flat, self._offsets,
+                self._needle_types, len(self.types)
+            )
+            return dict(zip(self.types, counts.tolist()))
+        
+        counts = [0] * len(self.types)
+        for t, kw in self._needles:
+            counts[t] += _count_words(buf, kw)
+        return dict(zip(self.types, counts))
@@ -0,0 +1,168 @@
+from typing import Dict, Any, List, Optional, Tuple
+import base64
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Inserts into a namespace between sweeps for expired rows
+PRUNE_EVERY = 256
+
+
+class _Namespace:
+    """FAISS index plus the entries stored alongside it, row for row.
+
+    Rows are appended in time order, so expired rows are always a prefix.
+    """
+    
+    def __init__(self, index, entries: List[Dict[str, Any]], path: str):
+        self.index = index
+        self.entries = entries
+        self.path = path
+        self.puts_since_prune = 0
+
+
+class SemanticCache:
+    """Embedding-keyed cache of agent results.
+
+    ``model`` is a preloaded SentenceTransformer shared across the process.
+    Near-duplicate documents (cosine similarity >= threshold) reuse the stored
+    JSON result instead of running the LLM again. Vectors are stored as float16.
+    Each namespace is persisted as an append-only ``{namespace}.jsonl`` log of
+    timestamp, payload and vector; the index is rebuilt from it on first use.
+    Expired rows are dropped on load and every ``PRUNE_EVERY`` inserts, and
+    the log is rewritten only when rows were dropped.
+    """
+    
+    def __init__(self, cache_dir: str, model, threshold: float = 0.95, ttl_seconds: int = 86400):
+        # Optional dependency - only needed when the cache is enabled
+        import faiss
+        
+        self._faiss = faiss
+        self.model = model
+        self.cache_dir = cache_dir
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def encode(self, text: str) -> np.ndarray:
+        """Return a (1, dim) L2-normalized float32 embedding"""
+        emb = self.model.encode([text], normalize_embeddings=True, convert_to_numpy=True)
+        return np.ascontiguousarray(emb, dtype=np.float32)
+    
+    def lookup(self, emb: np.ndarray, namespace: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            ns = self._get_namespace(namespace, emb.shape[1])
+            if ns.index.ntotal == 0:
+                return None
+            
+            # Look past the nearest hit in case it has expired
+            scores, ids = ns.index.search(emb, min(4, ns.index.ntotal))
+            now = time.time()
+            for score, idx in zip(scores[0], ids[0]):
+                if idx < 0 or score < self.threshold:
+                    break
+                entry = ns.entries[idx]
+                if now - entry["ts"] <= self.ttl_seconds:
+                    return entry["payload"]
+        return None
+    
+    def search(self, text: str, namespace: str) -> Tuple[np.ndarray, Optional[Dict[str, Any]]]:
+        """Encode ``text`` and look it up; returns the embedding for a later put()"""
+        emb = self.encode(text)
+        return emb, self.lookup(emb, namespace)
+    
+    def put(self, emb: np.ndarray, payload: Dict[str, Any], namespace: str):
+        vec = base64.b64encode(emb.astype(np.float16).tobytes()).decode("ascii")
+        entry = {"ts": time.time(), "payload": payload}
+        line = json.dumps({**entry, "vec": vec}) + "\n"
+        with self._lock:
+            ns = self._get_namespace(namespace, emb.shape[1])
+            ns.index.add(emb)
+            ns.entries.append(entry)
+            with open(ns.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            
+            ns.puts_since_prune += 1
+            if ns.puts_since_prune >= PRUNE_EVERY:
+                ns.puts_since_prune = 0
+                self._prune(ns)
+    
+    def _prune(self, ns: _Namespace):
+        """Drop expired rows from the index and the log"""
+        cutoff = time.time() - self.ttl_seconds
+        expired = 0
+        while expired < len(ns.entries) and ns.entries[expired]["ts"] < cutoff:
+            expired += 1
+        if expired == 0:
+            return
+        
+        ns.index.remove_ids(self._faiss.IDSelectorRange(0, expired))
+        del ns.entries[:expired]
+        # Vectors are only kept in the log, so carry the surviving lines over
+        with open(ns.path, "r", encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()][expired:]
+        self._rewrite(ns.path, lines)
+    
+    @staticmethod
+    def _rewrite(path: str, lines: List[str]):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(tmp_path, path)
+    
+    def _get_namespace(self, namespace: str, dim: int) -> _Namespace:
+        ns = self._namespaces.get(namespace)
+        if ns is not None:
+            return ns
+        
+        path = os.path.join(self.cache_dir, f"{namespace.replace(':', '__')}.jsonl")
+        # Exhaustive inner-product search over float16 codes: half the
+        # memory of IndexFlatIP, and fp16 error is far below the threshold
+        index = self._faiss.IndexScalarQuantizer(
+            dim, self._faiss.ScalarQuantizer.QT_fp16, self._faiss.METRIC_INNER_PRODUCT
+        )
+        
+        # Older versions kept a separate .faiss file per namespace
+        legacy_index = path[:-len(".jsonl")] + ".faiss"
+        if os.path.exists(legacy_index):
+            os.remove(legacy_index)
+        
+        entries: List[Dict[str, Any]] = []
+        if os.path.exists(path):
+            cutoff = time.time() - self.ttl_seconds
+            kept: List[str] = []
+            vectors: List[np.ndarray] = []
+            dropped = 0
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    vec = record.get("vec")
+                    if vec is None or record["ts"] < cutoff:
+                        dropped += 1
+                        continue
+                    vector = np.frombuffer(base64.b64decode(vec), dtype=np.float16)
+                    if vector.shape[0] != dim:
+                        dropped += 1
+                        continue
+                    kept.append(line)
+                    vectors.append(vector)
+                    entries.append({"ts": record["ts"], "payload": record["payload"]})
+            if vectors:
+                index.add(np.vstack(vectors).astype(np.float32))
+            if dropped:
+                logger.info(f"Semantic cache '{namespace}': dropped {dropped} expired or unreadable rows")
+                self._rewrite(path, kept)
+        
+        ns = _Namespace(index, entries, path)
+        self._namespaces[namespace] = ns
+        return ns
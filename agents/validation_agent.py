@@ -1,29 +1,15 @@
-from crewai import Agent, Task, Crew
 from typing import Dict, Any
 import json
-import re
 
-class ValidationAgent:
-    def __init__(self, llm):
-        self.llm = llm
-        self.agent = Agent(
-            role="Data Validation Specialist",
-            goal="Ensure data consistency and quality",
-            backstory="""You are a quality assurance expert who validates 
-            extracted data for consistency and completeness.""",
-            verbose=False,
-            allow_delegation=False,
-            llm=llm
-        )
-    
-    def validate(self, extracted_data: Dict[str, Any], document_content: str) -> Dict[str, Any]:
-        content_preview = document_content[:1500]
-        
-        task = Task(
-            description=f"""Validate this extracted data:
+from agents.base import LLMJsonAgent
+from models import ExtractionResult, ValidationResult
 
-Extracted: {json.dumps(extracted_data.get('fields', {}), indent=2)}
-Original: {content_preview}
+class ValidationAgent(LLMJsonAgent):
+    ROLE = "Data Validation Specialist"
+    GOAL = "Ensure data consistency and quality"
+    BACKSTORY = """You are a quality assurance expert who validates extracted data for
+consistency and completeness."""
+    SYSTEM = BACKSTORY + """
 
 Check:
 1. Do values match the document?
@@ -32,42 +18,44 @@ Check:
 4. Is data logically consistent?
 
 Return VALID JSON:
-{{
+{
     "is_valid": true or false,
-    "conflicts": ["list conflicts"],
+    "conflicts": [{"field": "field_name", "issue": "describe the conflict"}],
     "missing_fields": ["list missing"],
     "confidence": 0.0 to 1.0,
     "warnings": ["list warnings"]
-}}
+}
 
-ONLY return JSON.""",
-            agent=self.agent,
-            expected_output="JSON validation result"
-        )
+ONLY return JSON."""
+    MAX_TOKENS = 600
+    MODEL_SETTING = "ollama_model_fast"
+    NUM_PREDICT_SETTING = "validate_num_predict"
+    LABEL = "Validation"
+    RESULT_MODEL = ValidationResult
+    
+    async def validate(self, extracted_data: ExtractionResult, document_content: str) -> Dict[str, Any]:
+        content_preview = self._preview(document_content)
         
-        crew = Crew(
-            agents=[self.agent],
-            tasks=[task],
-            verbose=False
+        # Key on the extracted values as well as the source text
+        fields_key = json.dumps(getattr(extracted_data, 'fields', {}), sort_keys=True)
+        return await self.run(
+            "validate", (fields_key, content_preview), self._prompt(extracted_data, content_preview)
         )
-        
-        try:
-            result = crew.kickoff()
-            result_str = str(result)
-            
-            json_match = re.search(r'\{.*\}', result_str, re.DOTALL)
-            if json_match:
-                parsed = json.loads(json_match.group())
-                return parsed
-            else:
-                raise ValueError("No JSON in response")
-                
-        except Exception as e:
-            print(f"Validation error: {e}")
-            return {
-                "is_valid": False,
-                "conflicts": [],
-                "missing_fields": [],
-                "confidence": 0.0,
-                "warnings": [str(e)]
-            }
\ No newline at end of file
+    
+    def _prompt(self, extracted_data: ExtractionResult, content_preview: str) -> str:
+        return f"""Validate this extracted data:
+
+Extracted: {json.dumps(getattr(extracted_data, 'fields', {}), indent=2)}
+
+Original:
+{content_preview}"""
+
+    @staticmethod
+    def _fallback(e: Exception) -> Dict[str, Any]:
+        return {
+            "is_valid": False,
+            "conflicts": [],
+            "missing_fields": [],
+            "confidence": 0.0,
+            "warnings": [str(e)]
+        }
@@ -2,7 +2,7 @@
 Configuration settings for the application
 """
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # App Settings
@@ -14,22 +14,91 @@ class Settings(BaseSettings):
     # Storage
     upload_dir: str = "./uploads"
     state_dir: str = "./state"
+    # In-memory results: entries expire after results_ttl seconds
+    results_max_entries: int = 10000
+    results_ttl: int = 86400
+    results_list_limit: int = 1000
     
     # Processing
     max_concurrent_requests: int = 5
     processing_timeout: int = 300
     confidence_threshold: float = 0.7
+    # Ask the LLM to apply the routing rules instead of evaluating them in Python
+    llm_routing: bool = False
+    # Run all four agents as one sequential Crew instead of the LangGraph workflow
+    fused_crew_enabled: bool = False
+    # Run the workflow nodes through the LangGraph graph instead of calling
+    # them back to back (same steps, more per-node overhead)
+    workflow_use_graph: bool = False
+    # Unknown documents classified below this confidence skip extraction and
+    # validation and go straight to manual review
+    skip_extraction_below: float = 0.3
+    
+    # Pack classify/extract prompts from concurrent documents into one request
+    packed_batching_enabled: bool = False
+    packed_batch_size: int = 8
+    packed_max_wait_ms: int = 20
+    # Context for packed requests: a full batch of previews plus their answers.
+    # With packing on it is used for every agent request (see agent_num_ctx)
+    packed_num_ctx: int = 16384
+    
+    # Workflow result caches for byte-identical documents (entries per cache)
+    workflow_cache_size: int = 10000
+    # Also keep them on disk under STATE_DIR (requires diskcache), so warm
+    # restarts don't re-run the LLM on documents seen before
+    workflow_cache_persist: bool = False
+    # Seconds a persisted result stays valid
+    workflow_cache_ttl: int = 604800
+    # Attempts per Ollama call on connection errors and 5xx responses (read
+    # timeouts are not retried - the generation itself took too long)
+    llm_retry_attempts: int = 3
+    
+    # Semantic Cache (requires sentence-transformers + faiss-cpu)
+    semantic_cache_enabled: bool = False
+    semantic_cache_model: str = "all-MiniLM-L6-v2"
+    semantic_cache_threshold: float = 0.95
+    semantic_cache_ttl: int = 86400
     
     # LLM Settings - OLLAMA (Primary)
     llm_provider: str = "ollama"
     ollama_base_url: str = "http://localhost:11434"
     ollama_model: str = "llama3.2:latest"
+    # Quantized models for the direct agent calls: Q4 for the coarse decisions
+    # (classify, validate, route), Q8 where extraction accuracy matters
+    ollama_model_fast: str = "llama3.2:3b-instruct-q4_K_M"
+    ollama_model_accurate: str = "llama3.2:3b-instruct-q8_0"
+    # Hugging Face tokenizer matching the Ollama model, used for prompt
+    # truncation (e.g. meta-llama/Llama-3.2-1B, a gated repo that needs HF_TOKEN).
+    # Unset means no Hub request at startup and character-based truncation
+    tokenizer_name: Optional[str] = None
+    # How long Ollama keeps the model (and its prompt KV cache) loaded between requests
+    ollama_keep_alive: str = "60m"
+    # Load the models and the classification prompt prefix at startup
+    ollama_prewarm: bool = True
+    
+    # Generation limits for the agent calls. Answers are a single small JSON
+    # object: num_predict caps the worst case per agent, and the stop
+    # sequences cut off anything the model rambles on with after it
+    classify_num_predict: int = 256
+    extract_num_predict: int = 512
+    validate_num_predict: int = 512
+    route_num_predict: int = 256
+    llm_stop: List[str] = ["\n\n\n", "```"]
+    llm_top_p: float = 0.9
+    # Context window: system prompt + largest preview (1000 tokens) + output
+    llm_num_ctx: int = 2048
     
     # Optional: Google Gemini (Fallback - not required)
     google_api_key: Optional[str] = None
     llm_model: str = "gemini-pro"
     llm_temperature: float = 0.1
     
+    @property
+    def agent_num_ctx(self) -> int:
+        """Context size for every agent request. Ollama reloads a model whenever
+        num_ctx changes, so packed and single requests must use the same one"""
+        return self.packed_num_ctx if self.packed_batching_enabled else self.llm_num_ctx
+    
     class Config:
         env_file = ".env"
         env_file_encoding = 'utf-8'
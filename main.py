@@ -4,29 +4,35 @@ This is the main entry point for the application
 """
 
 from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
+import asyncio
 import logging
 import os
-import json
+import shutil
+import time
 import aiofiles
-from datetime import datetime
-from typing import Dict
+import httpx
+import orjson
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Set, Tuple
+from pydantic import BaseModel
 import uuid
+from hashlib import blake2b
 
 from config import settings
-from models import (
-    DocumentUploadResponse, ProcessingResult, ProcessingStatus,
-    ClassificationResult, ExtractionResult, ValidationResult, RoutingDecision
-)
+from store import DocumentStore
+from models import DocumentUploadResponse, ProcessingResult, ProcessingStatus, build_schemas
 from workflow.document_workflow import DocumentWorkflow
+from workflow.fused_crew import FusedDocumentCrew
 from workflow.state import DocumentState
 from agents.classification_agent import ClassificationAgent
 from agents.extraction_agent import ExtractionAgent
 from agents.validation_agent import ValidationAgent
 from agents.routing_agent import RoutingAgent
+from agents.semantic_cache import SemanticCache
 
 # Setup logging
 logging.basicConfig(
@@ -35,9 +41,189 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# In-memory storage for processing results
-processing_results: Dict[str, Dict] = {}
-processing_queue: Dict[str, bool] = {}
+# Uploads are copied in chunks so memory use doesn't grow with file size
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+# Above this size the spooled temp file is copied in a worker thread instead
+LARGE_UPLOAD_BYTES = 16 << 20  # 16 MiB
+
+# In-memory storage for processing results, bounded by size and age
+processing_results = DocumentStore(settings.results_max_entries, settings.results_ttl)
+# IDs of documents queued or running
+processing_queue: Set[str] = set()
+# Pending result files, drained by disk_writer() off the request path
+disk_writes: "asyncio.Queue[Tuple[str, bytes]]" = asyncio.Queue()
+
+# Initialize LLM for CrewAI - OLLAMA
+logger.info(f"🤖 Initializing {settings.llm_provider.upper()} for CrewAI...")
+
+# Configure environment for Ollama with CrewAI
+# CrewAI requires OPENAI_API_KEY even when using Ollama (it won't be used)
+os.environ["OPENAI_API_KEY"] = "sk-dummy-key-for-crewai-compatibility"
+logger.info("🔑 Set dummy OpenAI key for CrewAI compatibility")
+
+try:
+    # Use string format that CrewAI natively understands for Ollama
+    # Format: "ollama/model_name" (without :latest tag)
+    model_name = settings.ollama_model.replace(":latest", "")
+    llm = f"ollama/{model_name}"
+    
+    logger.info(f"📡 Ollama endpoint: {settings.ollama_base_url}")
+    logger.info(f"🎯 Using model: {llm}")
+    logger.info(f"✅ Ollama configured for CrewAI!")
+    logger.info(f"💰 Cost: $0 - Running locally, no API fees!")
+
+except Exception as e:
+    logger.error(f"❌ Failed to configure Ollama: {e}")
+    logger.error("=" * 60)
+    logger.error("📋 Troubleshooting Steps:")
+    logger.error("1. Is Ollama running? → ollama serve")
+    logger.error("2. Is model downloaded? → ollama list")
+    logger.error("3. Verify connection: → curl http://localhost:11434/api/tags")
+    logger.error("=" * 60)
+    raise
+
+def model_response(model: BaseModel) -> Response:
+    """Encode a model with pydantic-core's serializer, skipping FastAPI's
+    jsonable_encoder and response_model re-validation. Warnings are off because
+    constructed models may hold plain dicts/strings for nested models/enums"""
+    return Response(model.model_dump_json(warnings=False), media_type="application/json")
+
+def dump_model(model: Optional[BaseModel]) -> Optional[Dict[str, Any]]:
+    """JSON-ready dict of one constructed workflow result, or None"""
+    if model is None:
+        return None
+    return model.model_dump(mode="json", warnings=False)
+
+# Keys of a /results response copied from the stored entry; ProcessingResult
+# itself only documents the schema. The timestamp is formatted separately
+RESULT_FIELDS = tuple(name for name in ProcessingResult.model_fields if name != "timestamp")
+
+def format_ns(ns: Optional[int]) -> Optional[str]:
+    """ISO-8601 UTC string for a time.time_ns() value, formatted only for display"""
+    if ns is None:
+        return None
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).isoformat()
+
+def copy_upload(src, filepath: str):
+    """Blocking copy of an UploadFile's spooled temp file to disk"""
+    src.seek(0)
+    with open(filepath, 'wb') as dst:
+        shutil.copyfileobj(src, dst, UPLOAD_CHUNK_SIZE)
+
+async def disk_writer():
+    """Write queued result files; a backlog is coalesced to the latest data per path"""
+    while True:
+        pending = [await disk_writes.get()]
+        while not disk_writes.empty():
+            pending.append(disk_writes.get_nowait())
+        
+        latest = dict(pending)
+        for path, data in latest.items():
+            try:
+                async with aiofiles.open(path, 'wb') as f:
+                    await f.write(data)
+            except Exception as e:
+                logger.error(f"❌ Failed to write {path}: {e}")
+        for _ in pending:
+            disk_writes.task_done()
+
+def init_agents(app: FastAPI):
+    """Build the shared caches, agents and workflow and store them on app.state"""
+    # Load the embedding model once per process and share it across agents
+    app.state.embed_model = None
+    app.state.cache = None
+    if settings.semantic_cache_enabled:
+        from sentence_transformers import SentenceTransformer
+        logger.info(f"🧠 Loading embedding model: {settings.semantic_cache_model}")
+        app.state.embed_model = SentenceTransformer(settings.semantic_cache_model, device="cpu")
+        # Warm up so the first document doesn't pay Torch initialization
+        app.state.embed_model.encode("warmup")
+        app.state.cache = SemanticCache(
+            os.path.join(settings.state_dir, "cache"),
+            app.state.embed_model,
+            threshold=settings.semantic_cache_threshold,
+            ttl_seconds=settings.semantic_cache_ttl
+        )
+        logger.info("✅ Semantic cache ready!")
+    
+    # Tokenizer for prompt truncation, loaded once per process
+    app.state.tok = None
+    if settings.tokenizer_name:
+        try:
+            from tokenizers import Tokenizer
+            app.state.tok = Tokenizer.from_pretrained(settings.tokenizer_name)
+            logger.info(f"✂️  Token-based truncation with {settings.tokenizer_name}")
+        except Exception as e:
+            logger.warning(f"⚠️  Tokenizer '{settings.tokenizer_name}' unavailable, truncating by characters: {e}")
+    else:
+        logger.info("✂️  No TOKENIZER_NAME set, truncating by characters")
+    
+    # Initialize agents
+    logger.info("🔧 Initializing AI agents...")
+    try:
+        cache, tok, client = app.state.cache, app.state.tok, app.state.ollama
+        app.state.agents = [
+            ClassificationAgent(cache, tok, client),
+            ExtractionAgent(cache, tok, client),
+            ValidationAgent(cache, tok, client),
+            RoutingAgent(settings.confidence_threshold, cache, client)
+        ]
+        for agent in app.state.agents:
+            # Prefix caching needs byte-identical system prompts across requests
+            digest = blake2b(agent.SYSTEM.encode(), digest_size=8).hexdigest()
+            logger.info(f"🔑 {type(agent).__name__} system prompt: {digest}")
+        logger.info("✅ All agents initialized!")
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize agents: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        raise
+    
+    # Initialize workflow
+    try:
+        if settings.fused_crew_enabled:
+            logger.info("🔄 Building fused crew...")
+            app.state.workflow = FusedDocumentCrew(llm, settings.confidence_threshold, app.state.tok)
+        else:
+            logger.info("🔄 Building workflow graph...")
+            cache_dir = None
+            if settings.workflow_cache_persist:
+                cache_dir = os.path.join(settings.state_dir, "results-cache")
+                logger.info(f"💾 Persisting workflow results to {cache_dir}")
+            app.state.workflow = DocumentWorkflow(*app.state.agents, cache_dir=cache_dir)
+        logger.info("✅ Workflow ready!")
+    except Exception as e:
+        logger.error(f"❌ Failed to build workflow: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        raise
+
+async def prewarm_ollama(app: FastAPI):
+    """Load the models into Ollama so the first document doesn't pay the load time"""
+    if settings.fused_crew_enabled:
+        models = [settings.ollama_model]
+    else:
+        models = [settings.ollama_model_fast, settings.ollama_model_accurate]
+    
+    try:
+        # An empty prompt only loads the model and pins it for keep_alive.
+        # Load it with the agents' context size, or their first request reloads it
+        options = {} if settings.fused_crew_enabled else {"num_ctx": settings.agent_num_ctx}
+        for model in dict.fromkeys(models):
+            logger.info(f"🔥 Loading {model} into Ollama...")
+            resp = await app.state.ollama.post("/api/generate", json={
+                "model": model,
+                "prompt": "",
+                "keep_alive": settings.ollama_keep_alive,
+                "options": options
+            })
+            resp.raise_for_status()
+        
+        if not settings.fused_crew_enabled:
+            await app.state.agents[0].warmup()
+        logger.info("✅ Ollama warmed up!")
+    except Exception as e:
+        logger.warning(f"⚠️  Ollama prewarm failed, first request will load the model: {e}")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -51,16 +237,36 @@ async def lifespan(app: FastAPI):
     logger.info(f"📁 Upload directory: {settings.upload_dir}")
     logger.info(f"💾 State directory: {settings.state_dir}")
     logger.info(f"🤖 Using: {settings.llm_provider.upper()} ({settings.ollama_model})")
+    logger.info(f"⚡ Agent models: {settings.ollama_model_fast} (fast), {settings.ollama_model_accurate} (accurate)")
     logger.info(f"💰 Cost: $0 - FREE & LOCAL!")
+    build_schemas()
+    # One keep-alive connection pool to Ollama, shared by every agent
+    app.state.ollama = httpx.AsyncClient(
+        base_url=settings.ollama_base_url,
+        timeout=httpx.Timeout(settings.processing_timeout, connect=5.0),
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+    )
+    init_agents(app)
+    if settings.ollama_prewarm:
+        await prewarm_ollama(app)
+    writer = asyncio.create_task(disk_writer())
     logger.info("=" * 60)
     yield
     # Shutdown
+    await disk_writes.join()
+    writer.cancel()
+    for agent in app.state.agents:
+        await agent.aclose()
+    await app.state.ollama.aclose()
+    if isinstance(app.state.workflow, DocumentWorkflow):
+        app.state.workflow.close()
     logger.info("👋 Application shutting down...")
 
 app = FastAPI(
     title="Document Processing System",
     description="AI-powered document processing with Ollama (FREE & LOCAL!)",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -73,72 +279,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize LLM for CrewAI - OLLAMA
-logger.info(f"🤖 Initializing {settings.llm_provider.upper()} for CrewAI...")
-
-# Configure environment for Ollama with CrewAI
-# CrewAI requires OPENAI_API_KEY even when using Ollama (it won't be used)
-os.environ["OPENAI_API_KEY"] = "sk-dummy-key-for-crewai-compatibility"
-logger.info("🔑 Set dummy OpenAI key for CrewAI compatibility")
-
-try:
-    # Use string format that CrewAI natively understands for Ollama
-    # Format: "ollama/model_name" (without :latest tag)
-    model_name = settings.ollama_model.replace(":latest", "")
-    llm = f"ollama/{model_name}"
-    
-    logger.info(f"📡 Ollama endpoint: {settings.ollama_base_url}")
-    logger.info(f"🎯 Using model: {llm}")
-    logger.info(f"✅ Ollama configured for CrewAI!")
-    logger.info(f"💰 Cost: $0 - Running locally, no API fees!")
-    
-except Exception as e:
-    logger.error(f"❌ Failed to configure Ollama: {e}")
-    logger.error("=" * 60)
-    logger.error("📋 Troubleshooting Steps:")
-    logger.error("1. Is Ollama running? → ollama serve")
-    logger.error("2. Is model downloaded? → ollama list")
-    logger.error("3. Verify connection: → curl http://localhost:11434/api/tags")
-    logger.error("=" * 60)
-    raise
-
-# Initialize agents
-logger.info("🔧 Initializing AI agents...")
-try:
-    classification_agent = ClassificationAgent(llm)
-    extraction_agent = ExtractionAgent(llm)
-    validation_agent = ValidationAgent(llm)
-    routing_agent = RoutingAgent(llm, settings.confidence_threshold)
-    logger.info("✅ All agents initialized!")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize agents: {e}")
-    import traceback
-    logger.error(traceback.format_exc())
-    raise
-
-# Initialize workflow
-logger.info("🔄 Building workflow graph...")
-try:
-    workflow = DocumentWorkflow(
-        classification_agent, 
-        extraction_agent, 
-        validation_agent, 
-        routing_agent
-    )
-    logger.info("✅ Workflow ready!")
-except Exception as e:
-    logger.error(f"❌ Failed to build workflow: {e}")
-    import traceback
-    logger.error(traceback.format_exc())
-    raise
-
-logger.info("=" * 60)
-
 async def process_document_background(document_id: str, filepath: str, filename: str):
     """Background task to process document through the workflow"""
     try:
         # Update status to processing
-        processing_results[document_id]["status"] = ProcessingStatus.PROCESSING
+        processing_results.update(document_id, status=ProcessingStatus.PROCESSING.value)
         logger.info(f"📄 Starting processing: {filename} (ID: {document_id})")
         
         # Read document content
@@ -148,72 +293,62 @@ async def process_document_background(document_id: str, filepath: str, filename:
         logger.info(f"📖 Read {len(content)} characters from {filename}")
         
         # Create initial state
-        state: DocumentState = {
-            "document_id": document_id,
-            "filename": filename,
-            "content": content,
-            "metadata": {
-                "upload_time": datetime.utcnow().isoformat(),
+        state = DocumentState(
+            document_id=document_id,
+            filename=filename,
+            content=content,
+            metadata={
+                "upload_time_ns": time.time_ns(),
                 "file_size": os.path.getsize(filepath),
                 "filepath": filepath
-            },
-            "status": "pending",
-            "classification_result": None,
-            "extraction_result": None,
-            "validation_result": None,
-            "routing_decision": None,
-            "errors": [],
-            "start_time": datetime.utcnow(),
-            "end_time": None
-        }
+            }
+        )
         
         # Process through workflow
         logger.info(f"🔄 Running workflow for {document_id}...")
-        result_state = await workflow.process_document(state)
+        result_state = await app.state.workflow.process_document(state)
         
         # Calculate processing time
         processing_time = None
-        if result_state.get('end_time'):
-            delta = result_state['end_time'] - result_state['start_time']
-            processing_time = delta.total_seconds()
+        if result_state.end_ns is not None:
+            processing_time = (result_state.end_ns - result_state.start_ns) / 1e9
             logger.info(f"⏱️  Processing completed in {processing_time:.1f}s")
         
-        # Build final result
-        final_result = ProcessingResult(
-            document_id=document_id,
-            status=ProcessingStatus(result_state['status']),
-            classification=ClassificationResult(**result_state['classification_result']) if result_state.get('classification_result') else None,
-            extraction=ExtractionResult(**result_state['extraction_result']) if result_state.get('extraction_result') else None,
-            validation=ValidationResult(**result_state['validation_result']) if result_state.get('validation_result') else None,
-            routing=RoutingDecision(**result_state['routing_decision']) if result_state.get('routing_decision') else None,
-            processing_time=processing_time,
-            errors=result_state['errors']
-        )
-        
-        # Store result in memory
-        processing_results[document_id] = json.loads(final_result.model_dump_json())
+        # Build the final result as a plain dict in the response shape;
+        # each workflow result is dumped on its own, with no wrapper model
+        result = {
+            "document_id": document_id,
+            "status": result_state.status.value,
+            "classification": dump_model(result_state.classification_result),
+            "extraction": dump_model(result_state.extraction_result),
+            "validation": dump_model(result_state.validation_result),
+            "routing": dump_model(result_state.routing_decision),
+            "processing_time": processing_time,
+            "errors": list(result_state.errors),
+            "timestamp_ns": time.time_ns()
+        }
+        processing_results.put(document_id, result)
         
         # Save result to disk
         result_path = os.path.join(settings.state_dir, f"{document_id}.json")
-        async with aiofiles.open(result_path, 'w') as f:
-            await f.write(final_result.model_dump_json(indent=2))
+        await disk_writes.put((result_path, orjson.dumps(result, option=orjson.OPT_INDENT_2)))
         
         logger.info(f"✅ Successfully processed: {filename}")
-        logger.info(f"📊 Classification: {result_state['classification_result'].get('document_type', 'unknown')}")
-        logger.info(f"🎯 Routing: {result_state['routing_decision'].get('destination', 'unknown')}")
-        
+        logger.info(f"📊 Classification: {getattr(result_state.classification_result, 'document_type', 'unknown')}")
+        logger.info(f"🎯 Routing: {getattr(result_state.routing_decision, 'destination', 'unknown')}")
+    
     except Exception as e:
         logger.error(f"❌ Error processing document {document_id}: {str(e)}")
         import traceback
         logger.error(traceback.format_exc())
-        processing_results[document_id] = {
+        processing_results.put(document_id, {
             "document_id": document_id,
-            "status": ProcessingStatus.FAILED,
+            "status": ProcessingStatus.FAILED.value,
             "errors": [str(e)],
-            "timestamp": datetime.utcnow().isoformat()
-        }
+            "timestamp_ns": time.time_ns()
+        })
     finally:
-        processing_queue[document_id] = False
+        processing_queue.discard(document_id)
 
 @app.get("/")
 async def root():
@@ -257,7 +392,7 @@ async def upload_document(
             )
         
         # Check concurrent processing limit
-        active_processing = sum(1 for v in processing_queue.values() if v)
+        active_processing = len(processing_queue)
         if active_processing >= settings.max_concurrent_requests:
             logger.warning(f"⚠️  Too many concurrent requests: {active_processing}/{settings.max_concurrent_requests}")
             raise HTTPException(
@@ -270,20 +405,24 @@ async def upload_document(
         
         # Save uploaded file
         filepath = os.path.join(settings.upload_dir, f"{document_id}_{file.filename}")
-        async with aiofiles.open(filepath, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
+        if file.size is not None and file.size >= LARGE_UPLOAD_BYTES:
+            await asyncio.to_thread(copy_upload, file.file, filepath)
+        else:
+            async with aiofiles.open(filepath, 'wb') as f:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
+        size = os.path.getsize(filepath)
         
-        logger.info(f"💾 Saved file: {filepath} ({len(content)} bytes)")
+        logger.info(f"💾 Saved file: {filepath} ({size} bytes)")
         
         # Initialize result storage
-        processing_results[document_id] = {
+        processing_results.put(document_id, {
             "document_id": document_id,
-            "status": ProcessingStatus.PENDING,
+            "status": ProcessingStatus.PENDING.value,
             "filename": file.filename,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        processing_queue[document_id] = True
+            "timestamp_ns": time.time_ns()
+        })
+        processing_queue.add(document_id)
         
         # Add to background processing queue
         background_tasks.add_task(
@@ -295,12 +434,12 @@ async def upload_document(
         
         logger.info(f"✅ Document queued for processing: {document_id}")
         
-        return DocumentUploadResponse(
+        return model_response(DocumentUploadResponse(
             document_id=document_id,
             status=ProcessingStatus.PENDING,
             message=f"Document '{file.filename}' uploaded successfully and queued for processing with FREE Ollama (Local AI)!"
-        )
-        
+        ))
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -312,25 +451,24 @@ async def upload_document(
 @app.get("/api/v1/documents/{document_id}/status")
 async def get_document_status(document_id: str):
     """Get current processing status of a document"""
-    if document_id not in processing_results:
+    summary = processing_results.summary(document_id)
+    if summary is None:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    result = processing_results[document_id]
-    return {
+    return ORJSONResponse({
         "document_id": document_id,
-        "status": result.get("status"),
-        "filename": result.get("filename"),
-        "timestamp": result.get("timestamp")
-    }
+        "status": summary["status"],
+        "filename": summary["filename"],
+        "timestamp": format_ns(summary["timestamp_ns"])
+    })
 
-@app.get("/api/v1/documents/{document_id}/results")
+@app.get("/api/v1/documents/{document_id}/results", response_model=ProcessingResult)
 async def get_document_results(document_id: str):
     """Get complete processing results for a document"""
-    if document_id not in processing_results:
+    result = processing_results.get(document_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    result = processing_results[document_id]
-    
     if result.get("status") == ProcessingStatus.PENDING:
         raise HTTPException(
             status_code=202,
@@ -343,23 +481,30 @@ async def get_document_results(document_id: str):
             detail="Document is currently being processed. Please try again in a few moments."
         )
     
-    return ProcessingResult(**result)
+    # Stored results are already JSON-ready dicts in the ProcessingResult shape
+    body = {name: result.get(name) for name in RESULT_FIELDS}
+    body["timestamp"] = format_ns(result.get("timestamp_ns"))
+    return ORJSONResponse(body)
 
 @app.delete("/api/v1/documents/{document_id}")
 async def cancel_processing(document_id: str):
     """Cancel document processing (only if still pending)"""
-    if document_id not in processing_results:
+    result = processing_results.get(document_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    if processing_results[document_id].get("status") == ProcessingStatus.PENDING:
-        processing_results[document_id]["status"] = ProcessingStatus.FAILED
-        processing_results[document_id]["errors"] = ["Processing cancelled by user"]
-        processing_queue[document_id] = False
+    if result.get("status") == ProcessingStatus.PENDING:
+        processing_results.update(
+            document_id,
+            status=ProcessingStatus.FAILED.value,
+            errors=["Processing cancelled by user"]
+        )
+        processing_queue.discard(document_id)
         
         logger.info(f"🚫 Processing cancelled for document: {document_id}")
         return {"message": "Processing cancelled successfully"}
     else:
-        current_status = processing_results[document_id].get("status")
+        current_status = result.get("status")
         raise HTTPException(
             status_code=400,
             detail=f"Cannot cancel: document is already '{current_status}'"
@@ -367,21 +512,23 @@ async def cancel_processing(document_id: str):
 
 @app.get("/api/v1/documents")
 async def list_documents():
-    """List all documents and their current status"""
-    return {
+    """List the newest documents and their current status"""
+    counts = processing_results.counts()
+    # Rows come from the store's hot columns; full results are never touched here
+    return ORJSONResponse({
         "documents": [
             {
                 "document_id": doc_id,
-                "status": result.get("status"),
-                "filename": result.get("filename"),
-                "timestamp": result.get("timestamp")
+                "status": status,
+                "filename": filename,
+                "timestamp": format_ns(timestamp_ns)
             }
-            for doc_id, result in processing_results.items()
+            for doc_id, status, filename, timestamp_ns in processing_results.newest(settings.results_list_limit)
         ],
-        "total": len(processing_results),
-        "processing": sum(1 for r in processing_results.values() if r.get("status") == ProcessingStatus.PROCESSING),
-        "completed": sum(1 for r in processing_results.values() if r.get("status") == ProcessingStatus.COMPLETED)
-    }
+        "total": sum(counts.values()),
+        "processing": counts[ProcessingStatus.PROCESSING.value],
+        "completed": counts[ProcessingStatus.COMPLETED.value]
+    })
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -389,7 +536,7 @@ async def global_exception_handler(request, exc):
     logger.error(f"🚨 Unhandled exception: {str(exc)}")
     import traceback
     logger.error(traceback.format_exc())
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "detail": "Internal server error",
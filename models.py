@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, Dict, List, Any
 from enum import Enum
 from datetime import datetime
@@ -14,6 +14,10 @@ class DocumentType(str, Enum):
 class ProcessingStatus(str, Enum):
     PENDING = "pending"
     PROCESSING = "processing"
+    # Intermediate workflow stages
+    CLASSIFIED = "classified"
+    EXTRACTED = "extracted"
+    VALIDATED = "validated"
     COMPLETED = "completed"
     FAILED = "failed"
     PARTIAL = "partial"
@@ -24,37 +28,42 @@ class RoutingDestination(str, Enum):
     REJECTED = "rejected_queue"
     SPECIALIST_REVIEW = "specialist_review_queue"
 
-class DocumentUploadResponse(BaseModel):
+class FrozenModel(BaseModel):
+    # Immutable once built, unknown keys rejected on validation, and the core
+    # schema is only built on first use instead of at import
+    model_config = ConfigDict(frozen=True, extra='forbid', defer_build=True)
+
+class DocumentUploadResponse(FrozenModel):
     document_id: str
     status: ProcessingStatus
     message: str
 
-class ClassificationResult(BaseModel):
+class ClassificationResult(FrozenModel):
     document_type: DocumentType
     confidence: float
     reasoning: str
     alternative_types: Optional[List[Dict[str, float]]] = None
 
-class ExtractionResult(BaseModel):
+class ExtractionResult(FrozenModel):
     fields: Dict[str, Any]
     confidence: float
     extraction_method: str
     warnings: List[str] = []
 
-class ValidationResult(BaseModel):
+class ValidationResult(FrozenModel):
     is_valid: bool
     conflicts: List[Dict[str, Any]] = []
     missing_fields: List[str] = []
     confidence: float
     warnings: List[str] = []
 
-class RoutingDecision(BaseModel):
+class RoutingDecision(FrozenModel):
     destination: RoutingDestination
     reasoning: str
     confidence: float
     requires_human_review: bool
 
-class ProcessingResult(BaseModel):
+class ProcessingResult(FrozenModel):
     document_id: str
     status: ProcessingStatus
     classification: Optional[ClassificationResult] = None
@@ -63,4 +72,17 @@ class ProcessingResult(BaseModel):
     routing: Optional[RoutingDecision] = None
     processing_time: Optional[float] = None
     errors: List[str] = []
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    # When the result was built (UTC); stored as timestamp_ns and only
+    # formatted when the response is built
+    timestamp: Optional[datetime] = None
+
+API_MODELS = (
+    DocumentUploadResponse, ClassificationResult, ExtractionResult,
+    ValidationResult, RoutingDecision, ProcessingResult
+)
+
+def build_schemas():
+    """Build the deferred core schemas up front (at app startup), so the first
+    request that touches each model doesn't pay for it"""
+    for model in API_MODELS:
+        model.model_rebuild(force=True)
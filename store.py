@@ -0,0 +1,159 @@
+"""
+store.py - Bounded in-memory store for document processing results
+"""
+
+from collections import Counter
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import threading
+
+from cachetools import TTLCache
+
+
+def _status_key(entry: Dict[str, Any]) -> Optional[str]:
+    # Entries hold either a ProcessingStatus or its JSON string value
+    status = entry.get("status")
+    return getattr(status, "value", status)
+
+
+class _ResultCache(TTLCache):
+    """TTLCache that reports every entry it drops, so the listing stays in sync"""
+    
+    def __init__(self, maxsize: int, ttl: float, on_evict: Callable[[str, Dict[str, Any]], None]):
+        super().__init__(maxsize, ttl)
+        self._on_evict = on_evict
+    
+    def popitem(self):
+        key, value = super().popitem()
+        self._on_evict(key, value)
+        return key, value
+    
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for key, value in expired:
+            self._on_evict(key, value)
+        return expired
+
+
+class DocumentStore:
+    """Processing results keyed by document ID, with O(1) per-status counts.
+
+    The fields the listing needs (ID, filename, status, timestamp) live in
+    parallel row-aligned lists, so listing is a linear scan over a few flat
+    arrays. Full result dicts live in a separate TTL cache and are only
+    touched by the status/results endpoints. Entries expire after ``ttl``
+    seconds and the oldest are evicted once ``maxsize`` is reached; their rows
+    are tombstoned and compacted away once they make up half the table.
+    """
+    
+    def __init__(self, maxsize: int = 10_000, ttl: float = 86_400):
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        # Hot columns, one row per document in upload order
+        self._ids: List[Optional[str]] = []
+        self._filenames: List[Optional[str]] = []
+        self._statuses: List[Optional[str]] = []
+        self._timestamps: List[Optional[int]] = []
+        self._rows: Dict[str, int] = {}
+        self._dead = 0
+        # Cold storage: the full entry per document
+        self._results = _ResultCache(maxsize, ttl, self._evict)
+    
+    def _evict(self, document_id: str, entry: Dict[str, Any]):
+        row = self._rows.pop(document_id, None)
+        if row is None:
+            return
+        self._counts[self._statuses[row]] -= 1
+        self._ids[row] = self._filenames[row] = self._statuses[row] = self._timestamps[row] = None
+        self._dead += 1
+        if self._dead * 2 > len(self._ids):
+            self._compact()
+    
+    def _compact(self):
+        live = [row for row in range(len(self._ids)) if self._ids[row] is not None]
+        self._ids = [self._ids[row] for row in live]
+        self._filenames = [self._filenames[row] for row in live]
+        self._statuses = [self._statuses[row] for row in live]
+        self._timestamps = [self._timestamps[row] for row in live]
+        self._rows = {document_id: row for row, document_id in enumerate(self._ids)}
+        self._dead = 0
+    
+    def _set_status(self, row: int, status: Optional[str]):
+        self._counts[self._statuses[row]] -= 1
+        self._statuses[row] = status
+        self._counts[status] += 1
+    
+    def __contains__(self, document_id: str) -> bool:
+        with self._lock:
+            return document_id in self._results
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self._results.expire()
+            return len(self._rows)
+    
+    def get(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Full entry for a document, or None if unknown or expired"""
+        with self._lock:
+            return self._results.get(document_id)
+    
+    def summary(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Listing fields for one document, read from the hot columns"""
+        with self._lock:
+            if document_id not in self._results:
+                return None
+            row = self._rows[document_id]
+            return {
+                "document_id": document_id,
+                "status": self._statuses[row],
+                "filename": self._filenames[row],
+                "timestamp_ns": self._timestamps[row]
+            }
+    
+    def put(self, document_id: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._results[document_id] = entry
+            row = self._rows.get(document_id)
+            if row is None:
+                self._rows[document_id] = len(self._ids)
+                self._ids.append(document_id)
+                self._filenames.append(entry.get("filename"))
+                self._statuses.append(_status_key(entry))
+                self._timestamps.append(entry.get("timestamp_ns"))
+                self._counts[_status_key(entry)] += 1
+                return
+            
+            # Replacing an entry (e.g. with the final result) keeps its row;
+            # the filename is only known from the upload
+            self._set_status(row, _status_key(entry))
+            if entry.get("filename") is not None:
+                self._filenames[row] = entry["filename"]
+            if entry.get("timestamp_ns") is not None:
+                self._timestamps[row] = entry["timestamp_ns"]
+    
+    def update(self, document_id: str, **fields: Any):
+        """Change fields of an existing entry in place, keeping its position"""
+        with self._lock:
+            entry = self._results.get(document_id)
+            if entry is None:
+                return
+            entry.update(fields)
+            if "status" in fields:
+                self._set_status(self._rows[document_id], _status_key(fields))
+    
+    def counts(self) -> Counter:
+        with self._lock:
+            self._results.expire()
+            return +self._counts
+    
+    def newest(self, limit: int = 1000) -> List[Tuple[str, str, Optional[str], Optional[int]]]:
+        """(document_id, status, filename, timestamp_ns) rows, newest first"""
+        with self._lock:
+            self._results.expire()
+            return list(islice(self._iter_rows_reversed(), limit))
+    
+    def _iter_rows_reversed(self) -> Iterator[Tuple[str, str, Optional[str], Optional[int]]]:
+        for row in range(len(self._ids) - 1, -1, -1):
+            document_id = self._ids[row]
+            if document_id is not None:
+                yield document_id, self._statuses[row], self._filenames[row], self._timestamps[row]
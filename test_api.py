@@ -4,6 +4,8 @@ This script tests all endpoints of the document processing system
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
 import time
 import json
 from pathlib import Path
@@ -12,6 +14,10 @@ from pathlib import Path
 BASE_URL = "http://localhost:8000"
 SAMPLE_DOCS_DIR = "sample_documents"
 
+# One keep-alive connection pool for every request in the suite
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
 def print_header(title: str):
     """Print a formatted section header"""
     print("\n" + "=" * 70)
@@ -35,7 +41,7 @@ def test_health_check():
     print_header("1. Health Check")
     
     try:
-        response = requests.get(f"{BASE_URL}/")
+        response = SESSION.get(f"{BASE_URL}/")
         
         if response.status_code == 200:
             data = response.json()
@@ -72,10 +78,12 @@ def test_upload_document(filename: str):
         print_info(f"Reading file: {filepath}")
         
         with open(filepath, "rb") as f:
-            files = {"file": (filename, f, "text/plain")}
-            response = requests.post(
+            # Streams the file to the socket in chunks instead of building the body in memory
+            body = MultipartEncoder(fields={"file": (filename, f, "text/plain")})
+            response = SESSION.post(
                 f"{BASE_URL}/api/v1/documents/upload",
-                files=files
+                data=body,
+                headers={"Content-Type": body.content_type}
             )
         
         if response.status_code == 200:
@@ -98,13 +106,16 @@ def test_upload_document(filename: str):
         print_error(f"Upload error: {e}")
         return None
 
-def test_check_status(doc_id: str, max_checks: int = 10):
-    """Test status checking endpoint"""
+def test_check_status(doc_id: str, timeout: float = 120):
+    """Poll the status endpoint with exponential backoff; fetch the results
+    as soon as processing finishes"""
     print_header("3. Checking Processing Status")
     
     try:
-        for i in range(max_checks):
-            response = requests.get(
+        deadline = time.monotonic() + timeout
+        i = 0
+        while True:
+            response = SESSION.get(
                 f"{BASE_URL}/api/v1/documents/{doc_id}/status"
             )
             
@@ -112,39 +123,40 @@ def test_check_status(doc_id: str, max_checks: int = 10):
                 data = response.json()
                 status = data.get('status')
                 
-                print(f"\n   Check {i+1}/{max_checks}:")
+                print(f"\n   Check {i+1}:")
                 print(f"   Status: {status}")
                 print(f"   Filename: {data.get('filename')}")
                 
                 if status in ['completed', 'failed', 'partial']:
                     print_success(f"Processing finished with status: {status}")
-                    return status
-                elif status == 'processing':
-                    print_info("Still processing... waiting 10 seconds")
-                    time.sleep(10)
-                else:  # pending
-                    print_info("Pending... waiting 10 seconds")
-                    time.sleep(10)
+                    return status, test_get_results(doc_id)
             else:
                 print_error(f"Status check failed: {response.status_code}")
-                return None
+                return None, None
+            
+            delay = min(0.25 * 2 ** i, 5)
+            if time.monotonic() + delay > deadline:
+                break
+            if status == 'processing':
+                print_info(f"Still processing... waiting {delay:g} seconds")
+            else:  # pending
+                print_info(f"Pending... waiting {delay:g} seconds")
+            time.sleep(delay)
+            i += 1
         
-        print_info(f"Status still not final after {max_checks} checks")
-        return None
+        print_info(f"Status still not final after {timeout:g} seconds")
+        return None, None
         
     except Exception as e:
         print_error(f"Status check error: {e}")
-        return None
+        return None, None
 
 def test_get_results(doc_id: str):
     """Test results retrieval endpoint"""
     print_header("4. Retrieving Processing Results")
     
     try:
-        print_info("Waiting 30 seconds for processing to complete...")
-        time.sleep(30)
-        
-        response = requests.get(
+        response = SESSION.get(
             f"{BASE_URL}/api/v1/documents/{doc_id}/results"
         )
         
@@ -222,7 +234,7 @@ def test_list_documents():
     print_header("5. Listing All Documents")
     
     try:
-        response = requests.get(f"{BASE_URL}/api/v1/documents")
+        response = SESSION.get(f"{BASE_URL}/api/v1/documents")
         
         if response.status_code == 200:
             data = response.json()
@@ -260,25 +272,14 @@ def run_full_test(filename: str = "invoice.txt"):
         print("\n❌ Server is not reachable. Aborting tests.")
         return False
     
-    time.sleep(2)
-    
     # Test 2: Upload Document
     doc_id = test_upload_document(filename)
     if not doc_id:
         print("\n❌ Upload failed. Aborting tests.")
         return False
     
-    time.sleep(2)
-    
-    # Test 3: Check Status
-    final_status = test_check_status(doc_id)
-    
-    time.sleep(2)
-    
-    # Test 4: Get Results
-    results = test_get_results(doc_id)
-    
-    time.sleep(2)
+    # Tests 3 & 4: Check Status, then Get Results as soon as it's final
+    final_status, results = test_check_status(doc_id)
     
     # Test 5: List Documents
     test_list_documents()
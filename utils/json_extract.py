@@ -0,0 +1,33 @@
+def find_json(s: str) -> str:
+    """Return the first balanced ``{...}`` object in an LLM response.
+
+    Single pass over the text, tracking brace depth and skipping braces inside
+    JSON strings (honoring backslash escapes). Raises ValueError if no complete
+    object is found.
+    """
+    start = s.find("{")
+    if start < 0:
+        raise ValueError("No JSON in response")
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(s)):
+        ch = s[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return s[start:i + 1]
+    
+    raise ValueError("Unterminated JSON in response")
@@ -0,0 +1,24 @@
+# Character budget per token when no tokenizer is loaded (matches the old
+# 2000/2500/1500 character previews for 800/1000/600 tokens)
+CHARS_PER_TOKEN = 2.5
+
+# Upper bound on characters per token, so only a prefix of a long document
+# is ever tokenized
+_MAX_CHARS_PER_TOKEN = 8
+
+
+def truncate_tokens(text: str, tokenizer, max_tokens: int) -> str:
+    """Cut ``text`` to at most ``max_tokens`` tokens of the model's tokenizer.
+
+    Falls back to a character cut when ``tokenizer`` is None. The cut is made
+    at the token's character offset, so the preview is a verbatim prefix of
+    the original text.
+    """
+    if tokenizer is None:
+        return text[:int(max_tokens * CHARS_PER_TOKEN)]
+    
+    prefix = text[:max_tokens * _MAX_CHARS_PER_TOKEN]
+    encoding = tokenizer.encode(prefix, add_special_tokens=False)
+    if len(encoding.ids) <= max_tokens:
+        return prefix
+    return text[:encoding.offsets[max_tokens - 1][1]]
@@ -1,18 +1,57 @@
+from typing import Any, Dict
+
 from langgraph.graph import StateGraph, END
+from config import settings
 from workflow.state import DocumentState
-from datetime import datetime
+from workflow.result_cache import ResultCache, open_disk_cache
+from agents.base import ERROR_KEY
+from agents.extraction_agent import PROMPT_TEMPLATES
+from models import (
+    ClassificationResult, ExtractionResult, ValidationResult, RoutingDecision, ProcessingStatus,
+    RoutingDestination
+)
+import asyncio
+import hashlib
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# LLM answers are validated once in LLMJsonAgent.run before they are cached;
+# everything else here is a hard-coded fallback or a cache entry, so the
+# models are built with model_construct - no validators on the hot path.
+
+def _prompt_digest(*parts: str) -> str:
+    return hashlib.blake2b("\x00".join(parts).encode(), digest_size=8).hexdigest()
+
 class DocumentWorkflow:
     def __init__(self, classification_agent, extraction_agent, 
-                 validation_agent, routing_agent):
+                 validation_agent, routing_agent, cache_dir=None):
         self.classification_agent = classification_agent
         self.extraction_agent = extraction_agent
         self.validation_agent = validation_agent
         self.routing_agent = routing_agent
-        self.graph = self._build_graph()
+        # Results for byte-identical documents (re-uploads, retries), keyed by
+        # sha256 of the content and (digest, document type) respectively.
+        # With cache_dir they are also persisted across restarts, namespaced by
+        # the agent's model and prompts so a change doesn't serve stale answers
+        self._disk = open_disk_cache(cache_dir) if cache_dir else None
+        cls_digest = _prompt_digest(classification_agent.model_name, classification_agent.SYSTEM)
+        ext_digest = _prompt_digest(
+            extraction_agent.model_name, extraction_agent.SYSTEM, *PROMPT_TEMPLATES.values()
+        )
+        self._cls_cache = ResultCache(
+            ClassificationResult, settings.workflow_cache_size, self._disk,
+            f"cls:{cls_digest}", settings.workflow_cache_ttl
+        )
+        self._ext_cache = ResultCache(
+            ExtractionResult, settings.workflow_cache_size, self._disk,
+            f"ext:{ext_digest}", settings.workflow_cache_ttl
+        )
+        # The nodes run back to back by default; the LangGraph graph is only
+        # built when asked for (e.g. to trace the workflow with LangGraph tooling)
+        self._use_graph = settings.workflow_use_graph
+        self.graph = self._build_graph() if self._use_graph else None
     
     def _build_graph(self):
         workflow = StateGraph(DocumentState)
@@ -23,98 +62,178 @@ class DocumentWorkflow:
         workflow.add_node("route", self._route_node)
         
         workflow.set_entry_point("classify")
-        workflow.add_edge("classify", "extract")
+        workflow.add_conditional_edges(
+            "classify", self._post_classify_router, {"extract": "extract", "route": "route"}
+        )
         workflow.add_edge("extract", "validate")
         workflow.add_edge("validate", "route")
         workflow.add_edge("route", END)
         
         return workflow.compile()
     
-    def _classify_node(self, state: DocumentState) -> DocumentState:
+    @staticmethod
+    def _cacheable(result) -> bool:
+        # Agent fallbacks report zero confidence; don't pin those
+        return float(getattr(result, 'confidence', 0) or 0) > 0
+    
+    @staticmethod
+    def _agent_error(state: DocumentState, label: str, result: Dict[str, Any]):
+        # Agents answer with their fallback when the LLM call fails; record why
+        error = result.pop(ERROR_KEY, None)
+        if error is not None:
+            state.errors.append(f"{label}: {error}")
+    
+    @staticmethod
+    def _post_classify_router(state: DocumentState) -> str:
+        # Nothing to extract from an unrecognised document; the outcome is
+        # manual review either way, so skip the two LLM calls. Only classify
+        # has run so far: if it failed, "unknown" is its fallback, not an answer
+        result = state.classification_result
+        if (not state.errors
+                and getattr(result, 'document_type', 'unknown') == 'unknown'
+                and float(getattr(result, 'confidence', 0) or 0) < settings.skip_extraction_below):
+            return "route"
+        return "extract"
+    
+    async def _classify_node(self, state: DocumentState) -> DocumentState:
         try:
-            logger.info(f"Classifying {state['document_id']}")
-            result = self.classification_agent.classify(
-                state['content'], state['metadata']
+            logger.info(f"Classifying {state.document_id}")
+            state.content_hash = hashlib.sha256(state.content.encode()).digest()
+            cached = await self._cls_cache.get(state.content_hash)
+            if cached is not None:
+                state.classification_result = cached
+                state.status = ProcessingStatus.CLASSIFIED
+                return state
+            
+            # Extraction's preview doesn't depend on the document type, so
+            # prepare it while the classification request is in flight
+            result, state.extraction_prep = await asyncio.gather(
+                self.classification_agent.classify(state.content, state.metadata),
+                self.extraction_agent.prepare(state.content)
             )
-            state['classification_result'] = result
-            state['status'] = 'classified'
+            self._agent_error(state, "Classification", result)
+            state.classification_result = ClassificationResult.model_construct(**result)
+            state.status = ProcessingStatus.CLASSIFIED
+            if self._cacheable(state.classification_result):
+                await self._cls_cache.put(state.content_hash, state.classification_result)
         except Exception as e:
             logger.error(f"Classification failed: {e}")
-            state['errors'].append(f"Classification: {e}")
-            state['classification_result'] = {
-                "document_type": "unknown",
-                "confidence": 0.0,
-                "reasoning": str(e)
-            }
+            state.errors.append(f"Classification: {e}")
+            state.classification_result = ClassificationResult.model_construct(
+                document_type="unknown",
+                confidence=0.0,
+                reasoning=str(e)
+            )
         return state
     
-    def _extract_node(self, state: DocumentState) -> DocumentState:
+    async def _extract_node(self, state: DocumentState) -> DocumentState:
         try:
-            logger.info(f"Extracting {state['document_id']}")
-            doc_type = state['classification_result'].get('document_type', 'unknown')
-            result = self.extraction_agent.extract(state['content'], doc_type)
-            state['extraction_result'] = result
-            state['status'] = 'extracted'
+            logger.info(f"Extracting {state.document_id}")
+            doc_type = getattr(state.classification_result, 'document_type', 'unknown')
+            key = (state.content_hash, doc_type)
+            cached = await self._ext_cache.get(key) if state.content_hash is not None else None
+            if cached is not None:
+                state.extraction_result = cached
+                state.status = ProcessingStatus.EXTRACTED
+                return state
+            
+            result = await self.extraction_agent.extract(
+                state.content, doc_type, state.extraction_prep
+            )
+            self._agent_error(state, "Extraction", result)
+            state.extraction_result = ExtractionResult.model_construct(**result)
+            state.status = ProcessingStatus.EXTRACTED
+            if state.content_hash is not None and self._cacheable(state.extraction_result):
+                await self._ext_cache.put(key, state.extraction_result)
         except Exception as e:
             logger.error(f"Extraction failed: {e}")
-            state['errors'].append(f"Extraction: {e}")
-            state['extraction_result'] = {
-                "fields": {},
-                "confidence": 0.0,
-                "extraction_method": "failed",
-                "warnings": [str(e)]
-            }
+            state.errors.append(f"Extraction: {e}")
+            state.extraction_result = ExtractionResult.model_construct(
+                fields={},
+                confidence=0.0,
+                extraction_method="failed",
+                warnings=[str(e)]
+            )
         return state
     
-    def _validate_node(self, state: DocumentState) -> DocumentState:
+    async def _validate_node(self, state: DocumentState) -> DocumentState:
         try:
-            logger.info(f"Validating {state['document_id']}")
-            result = self.validation_agent.validate(
-                state['extraction_result'], state['content']
+            logger.info(f"Validating {state.document_id}")
+            result = await self.validation_agent.validate(
+                state.extraction_result, state.content
             )
-            state['validation_result'] = result
-            state['status'] = 'validated'
+            self._agent_error(state, "Validation", result)
+            state.validation_result = ValidationResult.model_construct(**result)
+            state.status = ProcessingStatus.VALIDATED
         except Exception as e:
             logger.error(f"Validation failed: {e}")
-            state['errors'].append(f"Validation: {e}")
-            state['validation_result'] = {
-                "is_valid": False,
-                "conflicts": [],
-                "missing_fields": [],
-                "confidence": 0.0,
-                "warnings": [str(e)]
-            }
+            state.errors.append(f"Validation: {e}")
+            state.validation_result = ValidationResult.model_construct(
+                is_valid=False,
+                conflicts=[],
+                missing_fields=[],
+                confidence=0.0,
+                warnings=[str(e)]
+            )
         return state
     
-    def _route_node(self, state: DocumentState) -> DocumentState:
+    async def _route_node(self, state: DocumentState) -> DocumentState:
         try:
-            logger.info(f"Routing {state['document_id']}")
-            result = self.routing_agent.route(
-                state['classification_result'],
-                state['extraction_result'],
-                state['validation_result']
+            logger.info(f"Routing {state.document_id}")
+            if state.extraction_result is None:
+                # Skipped by _post_classify_router
+                state.routing_decision = RoutingDecision.model_construct(
+                    destination=RoutingDestination.MANUAL_REVIEW,
+                    reasoning="unrecognised document type, extraction skipped",
+                    confidence=float(getattr(state.classification_result, 'confidence', 0) or 0),
+                    requires_human_review=True
+                )
+                state.status = ProcessingStatus.COMPLETED
+                state.end_ns = time.monotonic_ns()
+                return state
+            
+            result = await self.routing_agent.route(
+                state.classification_result,
+                state.extraction_result,
+                state.validation_result
             )
-            state['routing_decision'] = result
-            state['status'] = 'completed'
-            state['end_time'] = datetime.utcnow()
+            self._agent_error(state, "Routing", result)
+            state.routing_decision = RoutingDecision.model_construct(**result)
+            state.status = ProcessingStatus.PARTIAL if state.errors else ProcessingStatus.COMPLETED
+            state.end_ns = time.monotonic_ns()
         except Exception as e:
             logger.error(f"Routing failed: {e}")
-            state['errors'].append(f"Routing: {e}")
-            state['routing_decision'] = {
-                "destination": "manual_review_queue",
-                "reasoning": str(e),
-                "confidence": 0.0,
-                "requires_human_review": True
-            }
-            state['status'] = 'partial'
+            state.errors.append(f"Routing: {e}")
+            state.routing_decision = RoutingDecision.model_construct(
+                destination="manual_review_queue",
+                reasoning=str(e),
+                confidence=0.0,
+                requires_human_review=True
+            )
+            state.status = ProcessingStatus.PARTIAL
         return state
     
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+    
+    async def _fused(self, state: DocumentState) -> DocumentState:
+        """Same steps and edges as the graph, without LangGraph's per-node dispatch"""
+        state = await self._classify_node(state)
+        if self._post_classify_router(state) == "extract":
+            state = await self._extract_node(state)
+            state = await self._validate_node(state)
+        return await self._route_node(state)
+    
     async def process_document(self, state: DocumentState) -> DocumentState:
         try:
+            if not self._use_graph:
+                return await self._fused(state)
+            # LangGraph hands back the final channel values as a plain dict
             result = await self.graph.ainvoke(state)
-            return result
+            return DocumentState(**result)
         except Exception as e:
             logger.error(f"Workflow failed: {e}")
-            state['errors'].append(f"Workflow: {e}")
-            state['status'] = 'failed'
+            state.errors.append(f"Workflow: {e}")
+            state.status = ProcessingStatus.FAILED
             return state
\ No newline at end of file
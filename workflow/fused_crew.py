@@ -0,0 +1,236 @@
+from crewai import Agent, Task, Crew, Process
+from workflow.state import DocumentState
+from models import (
+    ClassificationResult, ExtractionResult, ValidationResult, RoutingDecision, ProcessingStatus
+)
+from agents.classification_agent import ClassificationAgent
+from agents.extraction_agent import ExtractionAgent, FIELD_TEMPLATES
+from agents.validation_agent import ValidationAgent
+from agents.routing_agent import RoutingAgent
+from utils.json_extract import find_json
+from utils.truncate import truncate_tokens
+from typing import Dict, Any, List
+import asyncio
+import logging
+import time
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_FIELD_LIST = "\n".join(f"- {doc_type}: {fields}" for doc_type, fields in FIELD_TEMPLATES.items())
+
+CLASSIFY_TEMPLATE = """Analyze this document and classify it.
+
+Document Content:
+{classify_content}
+
+File Info: {file_size} bytes
+
+Identify the document type from these options:
+- invoice: Has invoice number, items, prices, totals
+- contract: Has parties, terms, obligations, signatures
+- purchase_order: Has PO number, vendor, items to purchase
+- technical_specification: Has product specs, requirements
+- mixed: Contains multiple document types
+- unknown: Cannot determine type
+
+Provide your analysis as VALID JSON with this exact structure:
+{
+    "document_type": "one of the types above",
+    "confidence": 0.0 to 1.0,
+    "reasoning": "explain your classification",
+    "alternative_types": []
+}
+
+IMPORTANT: Return ONLY the JSON object, no other text."""
+
+EXTRACT_TEMPLATE = """Extract data from this document, using the document type
+identified in the classification step:
+
+Document:
+{extract_content}
+
+Fields to extract for each document type:
+""" + _FIELD_LIST + """
+- any other type: key_information
+
+Return VALID JSON with this structure:
+{
+    "fields": {
+        "field_name": "extracted_value",
+        ...
+    },
+    "confidence": 0.0 to 1.0,
+    "extraction_method": "ai_extraction",
+    "warnings": ["list any issues"]
+}
+
+IMPORTANT: Return ONLY JSON, no other text."""
+
+VALIDATE_TEMPLATE = """Validate the data extracted in the previous step against the original document:
+
+Original: {validate_content}
+
+Check:
+1. Do values match the document?
+2. Are there any conflicts?
+3. Are critical fields missing?
+4. Is data logically consistent?
+
+Return VALID JSON:
+{
+    "is_valid": true or false,
+    "conflicts": ["list conflicts"],
+    "missing_fields": ["list missing"],
+    "confidence": 0.0 to 1.0,
+    "warnings": ["list warnings"]
+}
+
+ONLY return JSON."""
+
+ROUTE_TEMPLATE = """Route this document using the classification confidence, extraction
+confidence and validation result from the previous steps.
+
+Threshold: {threshold}
+
+Rules:
+- >0.8 confidence + valid → high_confidence_queue
+- 0.5-0.8 → manual_review_queue
+- <0.5 or invalid → specialist_review_queue
+
+Return VALID JSON:
+{
+    "destination": "queue_name",
+    "reasoning": "explain decision",
+    "confidence": 0.0 to 1.0,
+    "requires_human_review": true or false
+}
+
+ONLY JSON."""
+
+
+class FusedDocumentCrew:
+    """Runs classification, extraction, validation and routing as one sequential Crew.
+
+    Drop-in alternative to DocumentWorkflow: a single kickoff per document, with
+    CrewAI passing each task's output to the next as context instead of the
+    results being re-serialized into four separate prompts.
+    """
+    
+    def __init__(self, llm, confidence_threshold: float = 0.7, tokenizer=None):
+        self.llm = llm
+        self.threshold = confidence_threshold
+        self.tokenizer = tokenizer
+        self.classification_agent = self._agent(ClassificationAgent)
+        self.extraction_agent = self._agent(ExtractionAgent)
+        self.validation_agent = self._agent(ValidationAgent)
+        self.routing_agent = self._agent(RoutingAgent)
+    
+    def _agent(self, agent_cls) -> Agent:
+        return Agent(
+            role=agent_cls.ROLE,
+            goal=agent_cls.GOAL,
+            backstory=agent_cls.BACKSTORY,
+            verbose=False,
+            allow_delegation=False,
+            llm=self.llm
+        )
+    
+    def _build_crew(self) -> Crew:
+        # Tasks are rebuilt per kickoff: CrewAI interpolates inputs into them in place
+        classify = Task(
+            description=CLASSIFY_TEMPLATE,
+            agent=self.classification_agent,
+            expected_output="JSON classification result"
+        )
+        extract = Task(
+            description=EXTRACT_TEMPLATE,
+            agent=self.extraction_agent,
+            expected_output="JSON extraction result",
+            context=[classify]
+        )
+        validate = Task(
+            description=VALIDATE_TEMPLATE,
+            agent=self.validation_agent,
+            expected_output="JSON validation result",
+            context=[extract]
+        )
+        route = Task(
+            description=ROUTE_TEMPLATE,
+            agent=self.routing_agent,
+            expected_output="JSON routing decision",
+            # Routing needs the classification confidence as well
+            context=[classify, extract, validate]
+        )
+        return Crew(
+            agents=[self.classification_agent, self.extraction_agent,
+                    self.validation_agent, self.routing_agent],
+            tasks=[classify, extract, validate, route],
+            process=Process.sequential,
+            verbose=False
+        )
+    
+    def kickoff(self, inputs: Dict[str, Any]) -> List[str]:
+        result = self._build_crew().kickoff(inputs=inputs)
+        return [str(output.raw) for output in result.tasks_output]
+    
+    async def process_document(self, state: DocumentState) -> DocumentState:
+        content = state.content
+        inputs = {
+            "classify_content": truncate_tokens(content, self.tokenizer, ClassificationAgent.MAX_TOKENS),
+            "extract_content": truncate_tokens(content, self.tokenizer, ExtractionAgent.MAX_TOKENS),
+            "validate_content": truncate_tokens(content, self.tokenizer, ValidationAgent.MAX_TOKENS),
+            "file_size": state.metadata.get('file_size', 'unknown'),
+            "threshold": self.threshold,
+        }
+        
+        try:
+            logger.info(f"Running fused crew for {state.document_id}")
+            outputs = await asyncio.to_thread(self.kickoff, inputs)
+        except Exception as e:
+            logger.error(f"Fused crew failed: {e}")
+            state.errors.append(f"Workflow: {e}")
+            state.status = ProcessingStatus.FAILED
+            return state
+        
+        fallbacks = [
+            ("classification_result", "Classification", ClassificationResult, {
+                "document_type": "unknown",
+                "confidence": 0.0,
+                "reasoning": "",
+                "alternative_types": []
+            }),
+            ("extraction_result", "Extraction", ExtractionResult, {
+                "fields": {},
+                "confidence": 0.0,
+                "extraction_method": "failed",
+                "warnings": []
+            }),
+            ("validation_result", "Validation", ValidationResult, {
+                "is_valid": False,
+                "conflicts": [],
+                "missing_fields": [],
+                "confidence": 0.0,
+                "warnings": []
+            }),
+            ("routing_decision", "Routing", RoutingDecision, {
+                "destination": "manual_review_queue",
+                "reasoning": "",
+                "confidence": 0.0,
+                "requires_human_review": True
+            }),
+        ]
+        
+        # Crew output is LLM text, so validate it; only the fallbacks are constructed
+        for raw, (state_key, label, model, fallback) in zip(outputs, fallbacks):
+            try:
+                setattr(state, state_key, model.model_validate(orjson.loads(find_json(raw))))
+            except Exception as e:
+                logger.error(f"{label} output could not be parsed: {e}")
+                state.errors.append(f"{label}: {e}")
+                setattr(state, state_key, model.model_construct(**fallback))
+        
+        state.status = ProcessingStatus.PARTIAL if state.errors else ProcessingStatus.COMPLETED
+        state.end_ns = time.monotonic_ns()
+        return state
@@ -0,0 +1,52 @@
+from typing import Any, Hashable, Optional, Type
+import asyncio
+
+from cachetools import LRUCache
+from pydantic import BaseModel
+
+
+class ResultCache:
+    """LRU of workflow results, optionally backed by an on-disk cache.
+
+    The in-memory LRU answers repeats within a process. With ``disk`` (a
+    shared ``diskcache.Cache``) results also survive restarts, so re-running
+    the same corpus after a deploy doesn't hit the LLM again. Results are
+    persisted as plain dicts under ``(namespace, key)``, expire after ``ttl``
+    seconds, and are rebuilt with ``model_construct`` on the way back. Callers
+    put a digest of the model and prompt in ``namespace``, so changing either
+    stops old answers from being served.
+    """
+    
+    def __init__(self, model: Type[BaseModel], maxsize: int, disk=None, namespace: str = "",
+                 ttl: Optional[float] = None):
+        self.model = model
+        self.namespace = namespace
+        self.ttl = ttl
+        self._memory = LRUCache(maxsize=maxsize)
+        self._disk = disk
+    
+    async def get(self, key: Hashable) -> Optional[BaseModel]:
+        value = self._memory.get(key)
+        if value is not None or self._disk is None:
+            return value
+        
+        data = await asyncio.to_thread(self._disk.get, (self.namespace, key))
+        if data is None:
+            return None
+        value = self.model.model_construct(**data)
+        self._memory[key] = value
+        return value
+    
+    async def put(self, key: Hashable, value: BaseModel):
+        self._memory[key] = value
+        if self._disk is not None:
+            await asyncio.to_thread(
+                self._disk.set, (self.namespace, key), value.model_dump(warnings=False), expire=self.ttl
+            )
+
+
+def open_disk_cache(directory: str) -> Any:
+    # Optional dependency - only needed when persistence is enabled
+    import diskcache
+    
+    return diskcache.Cache(directory)
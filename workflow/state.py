@@ -1,16 +1,31 @@
-from typing import TypedDict, Optional, List, Dict, Any
-from datetime import datetime
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional, Deque, Dict, Any, Tuple
+import time
 
-class DocumentState(TypedDict):
+from models import (
+    ClassificationResult, ExtractionResult, ValidationResult, RoutingDecision, ProcessingStatus
+)
+
+# Most recent errors kept per document; older ones are dropped
+MAX_ERRORS = 16
+
+@dataclass(slots=True)
+class DocumentState:
     document_id: str
     filename: str
     content: str
     metadata: Dict[str, Any]
-    status: str
-    classification_result: Optional[Dict[str, Any]]
-    extraction_result: Optional[Dict[str, Any]]
-    validation_result: Optional[Dict[str, Any]]
-    routing_decision: Optional[Dict[str, Any]]
-    errors: List[str]
-    start_time: datetime
-    end_time: Optional[datetime]
\ No newline at end of file
+    status: ProcessingStatus = ProcessingStatus.PENDING
+    # sha256 of the content, for the workflow's result caches
+    content_hash: Optional[bytes] = None
+    classification_result: Optional[ClassificationResult] = None
+    # (preview, embedding) computed for extraction alongside classification
+    extraction_prep: Optional[Tuple[str, Any]] = None
+    extraction_result: Optional[ExtractionResult] = None
+    validation_result: Optional[ValidationResult] = None
+    routing_decision: Optional[RoutingDecision] = None
+    errors: Deque[str] = field(default_factory=lambda: deque(maxlen=MAX_ERRORS))
+    # Monotonic clock readings, only meaningful as a difference
+    start_ns: int = field(default_factory=time.monotonic_ns)
+    end_ns: Optional[int] = None